@@ -0,0 +1,190 @@
+"""Micro-benchmark of the entity update hot path.
+
+Builds every sensor and binary sensor entity against a fixture payload and
+times the sensor values, `is_on` and `extra_state_attributes`, per entity and
+for a whole coordinator update cycle.
+
+    python benchmarks/entity_update.py            # compare with the baseline
+    python benchmarks/entity_update.py --save     # store a new baseline
+
+Requires Home Assistant to be installed in the current environment.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.helpers.entity import DeviceInfo  # noqa: E402
+
+from custom_components.atonstorage.binary_sensor import (  # noqa: E402
+    INVERTER_BINARY_SENSOR_DESCRIPTIONS,
+    AtonStorageBinarySensorEntity,
+)
+from custom_components.atonstorage.atontc.battery import BatteryEstimator  # noqa: E402
+from custom_components.atonstorage.atontc.derived import compute_derived  # noqa: E402
+from custom_components.atonstorage.const import DOMAIN  # noqa: E402
+from custom_components.atonstorage.controller import Controller  # noqa: E402
+from custom_components.atonstorage.sensor import (  # noqa: E402
+    INVERTER_SENSOR_DESCRIPTIONS,
+    AtonStorageSensorEntity,
+    AtonStorageSensorEntityDescription,
+)
+
+FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "monitor.json")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline", "entity_update.json")
+# us, smaller slowdowns of a sub-microsecond accessor are timer noise
+NOISE_FLOOR = 0.1
+
+
+def load_controller(path: str = FIXTURE) -> Controller:
+    """Return a controller holding the fixture payload, without any I/O."""
+    controller = Controller.__new__(Controller)
+    controller.rate_limiter = None
+    with open(path, encoding="utf-8") as file:
+        controller.data = json.load(file)
+    controller.derived = compute_derived(controller.data)
+    controller.battery = BatteryEstimator()
+    return controller
+
+
+def build_entities(controller: Controller) -> list:
+    """Build every coordinator driven entity for the fixture controller."""
+    coordinator = SimpleNamespace(bridge=controller, poll_offset=None, poll_slot=None)
+    entry = SimpleNamespace(entry_id=controller.serial_number, options={})
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, controller.serial_number)},
+        name=f"AtonStorage {controller.serial_number}",
+        manufacturer="AtonStorage",
+        serial_number=controller.serial_number,
+    )
+    entities = []
+    for description in INVERTER_SENSOR_DESCRIPTIONS:
+        if isinstance(description, AtonStorageSensorEntityDescription):
+            entities.append(
+                AtonStorageSensorEntity(
+                    entry=entry,
+                    controller=controller,
+                    coordinator=coordinator,
+                    description=description,
+                    device_info=device_info,
+                )
+            )
+    for description in INVERTER_BINARY_SENSOR_DESCRIPTIONS:
+        entities.append(
+            AtonStorageBinarySensorEntity(
+                entry=entry,
+                controller=controller,
+                coordinator=coordinator,
+                description=description,
+                device_info=device_info,
+            )
+        )
+    return entities
+
+
+def _accessors(entity) -> dict:
+    if isinstance(entity, AtonStorageBinarySensorEntity):
+        return {"is_on": lambda: entity.is_on}
+    return {
+        # what _handle_coordinator_update computes into native_value
+        "native_value": lambda: entity._value_function(entity.controller),
+        "extra_state_attributes": lambda: entity.extra_state_attributes,
+    }
+
+
+def environment() -> dict:
+    """Describe what the timings were measured on, they only compare there."""
+    return {
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def run(number: int) -> dict:
+    """Return the timings in microseconds per call."""
+    entities = build_entities(load_controller())
+    results = {"entities": {}}
+
+    for entity in entities:
+        for name, accessor in _accessors(entity).items():
+            seconds = min(timeit.repeat(accessor, number=number, repeat=5))
+            key = f"{type(entity).__name__}.{entity.entity_description.key}.{name}"
+            results["entities"][key] = seconds / number * 1e6
+
+    accessors = [
+        accessor for entity in entities for accessor in _accessors(entity).values()
+    ]
+
+    def cycle():
+        for accessor in accessors:
+            accessor()
+
+    seconds = min(timeit.repeat(cycle, number=number, repeat=5))
+    results["cycle"] = seconds / number * 1e6
+    results["entity_count"] = len(entities)
+    results["environment"] = environment()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a line for every timing slower than the baseline."""
+    regressions = []
+    timings = {**results["entities"], "cycle": results["cycle"]}
+    reference = {**baseline["entities"], "cycle": baseline["cycle"]}
+    for key, value in timings.items():
+        previous = reference.get(key)
+        if (
+            previous
+            and value > previous * (1 + tolerance)
+            and value - previous > NOISE_FLOOR
+        ):
+            regressions.append(f"{key}: {previous:.2f}us -> {value:.2f}us")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown ratio"
+    )
+    args = parser.parse_args()
+
+    results = run(args.number)
+    for key, value in sorted(results["entities"].items()):
+        print(f"{key:<70} {value:8.2f} us")
+    print(f"{results['entity_count']} entities, full cycle {results['cycle']:.2f} us")
+
+    if args.save:
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {BASELINE}")
+        return 0
+
+    if not os.path.exists(BASELINE):
+        print("No baseline found, run with --save to create one")
+        return 0
+
+    with open(BASELINE, encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("environment") != results["environment"]:
+        print(f"Baseline measured on {baseline.get('environment')}, timings may differ")
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Memory footprint of the coordinator driven entities.
+
+Builds the entities of 1, 10 and 50 plants against the fixture payload and
+reports the memory allocated per entity and per plant, the latter also
+counting the controller and its snapshot.
+
+    python benchmarks/memory.py
+    python benchmarks/memory.py --plants 1 100
+
+Requires Home Assistant to be installed in the current environment.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from entity_update import build_entities, load_controller
+
+
+def measure(plants: int) -> dict:
+    """Return the bytes allocated by the controllers and entities of the plants."""
+    gc.collect()
+    tracemalloc.start()
+    controllers = []
+    entities = []
+
+    before = tracemalloc.take_snapshot()
+    for plant in range(plants):
+        controller = load_controller()
+        controller.data["serialNumber"] = f"T{plant:011d}"
+        controllers.append(controller)
+    after_controllers = tracemalloc.take_snapshot()
+    for controller in controllers:
+        entities.extend(build_entities(controller))
+    after_entities = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    controller_bytes = sum(
+        stat.size_diff for stat in after_controllers.compare_to(before, "filename")
+    )
+    entity_bytes = sum(
+        stat.size_diff
+        for stat in after_entities.compare_to(after_controllers, "filename")
+    )
+    return {
+        "plants": plants,
+        "entities": len(entities),
+        "per_entity": entity_bytes / len(entities),
+        "per_plant": (controller_bytes + entity_bytes) / plants,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plants", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    print(f"{'plants':>6} {'entities':>9} {'B/entity':>10} {'B/plant':>10}")
+    for plants in args.plants:
+        result = measure(plants)
+        print(
+            f"{result['plants']:6d} {result['entities']:9d} "
+            f"{result['per_entity']:10.0f} {result['per_plant']:10.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
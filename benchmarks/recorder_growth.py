@@ -0,0 +1,168 @@
+"""Database growth of the diagnostic attributes over a day of polls.
+
+Records a simulated day of polls of the `Last update` and `Request queue
+wait` sensors with the recorder of Home Assistant in a SQLite database,
+once with the diagnostics as recorded attributes, as they were before
+`_unrecorded_attributes`, and once as they are now, and reports the size
+of the states and state_attributes tables with their indexes.
+
+    python benchmarks/recorder_growth.py
+    python benchmarks/recorder_growth.py --polls 8640   # a day at 10 s
+
+Requires Home Assistant to be installed in the current environment.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from homeassistant import config_entries, loader  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.recorder import (  # noqa: E402
+    async_initialize_recorder,
+    get_instance,
+)
+from homeassistant.setup import async_setup_component  # noqa: E402
+
+from custom_components.atonstorage.sensor import (  # noqa: E402
+    AtonStorageSensorEntity,
+)
+
+FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "monitor.json")
+DEFAULT_POLLS = 2880  # a day at the default scan interval of 30 s
+TABLES = ("states", "state_attributes")
+
+
+def _polls(data: dict, count: int):
+    """Yield the snapshots of the day, the update delay and queue move."""
+    start = datetime.strptime(data["data"], "%d/%m/%Y %H:%M:%S")
+    for index in range(count):
+        yield {
+            **data,
+            "data": (start + timedelta(seconds=30 * index)).strftime(
+                "%d/%m/%Y %H:%M:%S"
+            ),
+            "DiffDate": str(5 + index * 7 % 40),
+        }, {
+            "requests": index * 3,
+            "delayed": index // 10,
+            "queued": 0,
+            "active": 0,
+            "wait_last_ms": index * 13 % 90,
+            "wait_avg_ms": 12.5 + index % 7,
+            "wait_max_ms": 310,
+        }
+
+
+def _states(data: dict, queue: dict, current: bool) -> list[tuple]:
+    """Return the (entity id, state, attributes, unrecorded) to write."""
+    if current:
+        unrecorded = AtonStorageSensorEntity._unrecorded_attributes
+        last_update = {
+            "serial number": data["serialNumber"],
+            "firmware version": data["fwScheda"],
+            "bios version": data["relBIOS"],
+        }
+        return [
+            ("sensor.plant_last_update", data["data"], last_update, unrecorded),
+            (
+                "sensor.plant_request_queue_wait",
+                queue["wait_last_ms"],
+                queue,
+                unrecorded,
+            ),
+            # Update delay is disabled by default
+            ("sensor.plant_status", data["status"], {}, unrecorded),
+            ("sensor.plant_status_man", data["statusMan"], {}, unrecorded),
+            ("sensor.plant_run_mode", data["runMode"], {}, unrecorded),
+        ]
+    last_update = {
+        "update delay (s)": data["DiffDate"],
+        "serial number": data["serialNumber"],
+        "firmware version": data["fwScheda"],
+        "bios version": data["relBIOS"],
+        "status": data["status"],
+        "status man": data["statusMan"],
+        "run mode": data["runMode"],
+    }
+    return [
+        ("sensor.plant_last_update", data["data"], last_update, frozenset()),
+        ("sensor.plant_request_queue_wait", queue["wait_last_ms"], queue, frozenset()),
+    ]
+
+
+async def _record(path: str, polls: int, current: bool) -> None:
+    with open(FIXTURE, encoding="utf-8") as file:
+        data = json.load(file)
+
+    hass = HomeAssistant(os.path.dirname(path))
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    async_initialize_recorder(hass)
+    await async_setup_component(
+        hass, "recorder", {"recorder": {"db_url": f"sqlite:///{path}"}}
+    )
+    await hass.async_start()
+    await get_instance(hass).async_recorder_ready.wait()
+
+    for snapshot, queue in _polls(data, polls):
+        for entity_id, state, attributes, unrecorded in _states(
+            snapshot, queue, current
+        ):
+            hass.states.async_set(
+                entity_id,
+                str(state),
+                {**attributes, "friendly_name": entity_id},
+                state_info={"unrecorded_attributes": unrecorded},
+            )
+        await get_instance(hass).async_block_till_done()
+
+    await hass.async_stop()
+
+
+def _sizes(path: str) -> dict[str, int]:
+    """Return the bytes used by the tables and their indexes."""
+    with sqlite3.connect(path) as connection:
+        pages = connection.execute(
+            "SELECT tbl_name, SUM(pgsize) FROM dbstat"
+            " JOIN sqlite_master USING (name) GROUP BY tbl_name"
+        ).fetchall()
+        rows = {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in TABLES
+        }
+    sizes = dict(pages)
+    return {
+        **{f"{table} rows": rows[table] for table in TABLES},
+        **{f"{table} bytes": sizes.get(table, 0) for table in TABLES},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=DEFAULT_POLLS)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, current in (("before", False), ("after", True)):
+            path = os.path.join(folder, f"{name}.db")
+            asyncio.run(_record(path, args.polls, current))
+            results[name] = _sizes(path)
+
+    columns = list(results["before"])
+    print(f"{'':<8}" + "".join(f"{column:>24}" for column in columns))
+    for name, sizes in results.items():
+        print(f"{name:<8}" + "".join(f"{sizes[column]:>24}" for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
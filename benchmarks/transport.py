@@ -0,0 +1,126 @@
+"""Benchmark of the HTTP transport used to poll the AtonTC portal.
+
+Runs the same refresh cycles with a plain client (no compression, a new
+connection per request), with the httpx defaults and with the tuned
+transport, and prints the bytes on the wire and the latency per cycle.
+
+    ATONTC_PASSWORD=... python benchmarks/transport.py --user USER --serial SERIAL
+
+Needs `httpx` and a real AtonTC account, `--http2` also needs `h2`.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "custom_components", "atonstorage"))
+
+import httpx  # noqa: E402
+
+from atontc.client import AtonTCClient  # noqa: E402
+from atontc.transport import create_async_client  # noqa: E402
+
+
+class MeteredClient:
+    """Wrap an httpx client and count the bytes received."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        """Initialize."""
+        self.client = client
+        self.wire_bytes = 0
+        self.body_bytes = 0
+
+    async def request(self, method: str, url: str, **kwargs):
+        response = await self.client.request(method, url, **kwargs)
+        self.wire_bytes += response.num_bytes_downloaded
+        self.body_bytes += len(response.content)
+        return response
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+def _transports(http2: bool) -> dict:
+    return {
+        "plain": lambda: httpx.AsyncClient(
+            verify=False,
+            headers={"Accept-Encoding": "identity"},
+            limits=httpx.Limits(max_keepalive_connections=0),
+        ),
+        "httpx defaults": lambda: httpx.AsyncClient(verify=False),
+        "tuned": lambda: create_async_client(http2=http2),
+    }
+
+
+async def _measure(args, factory) -> dict:
+    metered = MeteredClient(factory())
+    client = AtonTCClient(
+        args.user,
+        args.password,
+        args.serial,
+        {"interval": 15, "min_refresh_interval": 0},
+        async_client=metered,
+    )
+    timings = []
+    try:
+        # the first cycle logs in, keep it out of the figures
+        await client.refresh()
+        metered.wire_bytes = metered.body_bytes = 0
+        for _ in range(args.cycles):
+            started = time.perf_counter()
+            await client.refresh()
+            timings.append((time.perf_counter() - started) * 1000)
+            if args.pause:
+                await asyncio.sleep(args.pause)
+    finally:
+        await metered.client.aclose()
+
+    return {
+        "wire": metered.wire_bytes / args.cycles,
+        "body": metered.body_bytes / args.cycles,
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+    }
+
+
+async def _run(args) -> int:
+    results = {}
+    for name, factory in _transports(args.http2).items():
+        results[name] = await _measure(args, factory)
+
+    print(f"{'transport':<16} {'wire B':>9} {'body B':>9} {'mean ms':>9} {'p50 ms':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result['wire']:9.0f} {result['body']:9.0f} "
+            f"{result['mean']:9.1f} {result['median']:9.1f}"
+        )
+
+    plain, tuned = results["plain"], results["tuned"]
+    print(
+        f"tuned saves {plain['wire'] - tuned['wire']:.0f} bytes and "
+        f"{plain['mean'] - tuned['mean']:.1f} ms per cycle"
+    )
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", default="")
+    parser.add_argument("--password", default=os.environ.get("ATONTC_PASSWORD", ""))
+    parser.add_argument("--serial", required=True)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument(
+        "--pause", type=float, default=5, help="seconds between two cycles"
+    )
+    parser.add_argument("--http2", action="store_true")
+    return asyncio.run(_run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,17 @@
 """AtonStorage integration."""
 
+import cProfile
 import logging
+import os
+import sys
+from collections import deque
 from collections.abc import Awaitable, Callable
 from datetime import timedelta
+from time import monotonic, time
 from typing import TypeVar
 
 import async_timeout
+import httpx
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_DEVICE_ID,
@@ -15,17 +21,70 @@ from homeassistant.const import (
     CONF_USERNAME,
     Platform,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
 
-from .const import AVAILABLE_SENSORS, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .const import (
+    AVAILABLE_SENSORS,
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_MAX_SIZE,
+    CONF_HTTP2,
+    CONF_MAX_CONCURRENCY,
+    CONF_RATE_LIMIT,
+    CONF_TRACE,
+    DATA_HISTORY_CACHE,
+    DATA_POLL_SCHEDULER,
+    DATA_RATE_LIMITERS,
+    DATA_TRANSPORTS,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_EXPORT_MAX_SIZE,
+    DEFAULT_HTTP2,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_NAME,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TRACE,
+    DOMAIN,
+    EV_CHECK_INTERVAL,
+    EXPORT_FORMAT_NONE,
+    HISTORY_CACHE_MAX_SIZE,
+    RATE_LIMIT_BURST,
+    SIGNAL_SNAPSHOT,
+    SNAPSHOT_RING_SIZE,
+    TRACE_FILE,
+    TRACE_LOGGER,
+    TRACE_MAX_SIZE,
+)
+from .atontc.cache import HistoryCache
+from .atontc.ratelimit import RateLimiter
+from .atontc.trace import RotatingFileSink, Tracer, logger_sink, span
+from .atontc.transport import create_async_client
+from .controller import API_HOST
 from .controller import Controller as AtonStorage
+from .export import ExportSink
+from .history import BatteryVoltageHistory
+from .schedule import TimeShiftCoordinator
+from .services import async_setup_services
+from .stagger import PollScheduler
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
+# options that rebuild the transport or the export sink
+RELOAD_OPTIONS = {
+    CONF_EXPORT_FORMAT: DEFAULT_EXPORT_FORMAT,
+    CONF_EXPORT_MAX_SIZE: DEFAULT_EXPORT_MAX_SIZE,
+}
+
 PLATFORMS = [
     Platform.SENSOR,
     Platform.BINARY_SENSOR,
@@ -34,9 +93,16 @@ TIMEOUT = 10
 
 T = TypeVar("T")
 
+# Python 3.12 allows a single active cProfile profiler per process, so the
+# coordinators share one and only its owner profiles its cycles
+_PROFILER = cProfile.Profile()
+_profiler_owner: "AtonStorageUpdateCoordinator | None" = None
+
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the atonStorage component from YAML."""
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
     return True
 
 
@@ -48,12 +114,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     password = entry.data.get(CONF_PASSWORD)
     serial_number = entry.data.get(CONF_DEVICE_ID)
     scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-    sensors_selected = entry.data.get(CONF_MONITORED_VARIABLES, AVAILABLE_SENSORS)
+    sensors_selected = _get_sensors_selected(entry)
+    export_format = entry.options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT)
 
+    async_client = None
     try:
+        async_client = await _async_acquire_transport(hass, entry)
         opts = {
-            "session": async_get_clientsession(hass),
             "interval": scan_interval,
+            "async_client": async_client,
+            "rate_limiter": _get_rate_limiter(hass, entry),
+            "history_cache": _get_history_cache(hass),
         }
         controller = AtonStorage(hass, user, password, serial_number, opts)
 
@@ -61,29 +132,322 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             hass, controller, serial_number, timedelta(seconds=scan_interval)
         )
 
+        entry.async_on_unload(_get_poll_scheduler(hass).register(serial_number))
+        coordinator.poll_scheduler = _get_poll_scheduler(hass)
+
+        await _async_check_external_ev(controller)
+
+        time_shift_coordinator = TimeShiftCoordinator(hass, controller, serial_number)
+        await time_shift_coordinator.async_load()
+        if time_shift_coordinator.data is None:
+            # nothing stored, do not wait a whole check interval for it
+            await time_shift_coordinator.async_refresh()
+
         hass.data[DOMAIN][entry.entry_id] = {
             "coordinator": coordinator,
+            "time_shift_coordinator": time_shift_coordinator,
             "controller": controller,
             "username": user,
             "sensors_selected": sensors_selected,
+            "options": dict(entry.options),
+            "entities": [],
+            "entity_adders": [],
+            "trace_sink": None,
+            "export_sink": None,
+            "battery_voltage_history": None,
+            # shared by every entity of the entry
+            "device_info": DeviceInfo(
+                identifiers={(DOMAIN, serial_number)},
+                name=f"{DEFAULT_NAME} {serial_number}",
+                manufacturer="AtonStorage",
+                sw_version=controller.fw_Scheda,
+                serial_number=controller.serial_number,
+            ),
         }
 
     except Exception as exc:
         _LOGGER.error("Unable to connect to AtonStorage controller: %s", str(exc))
+        if async_client is not None:
+            await _async_release_transport(hass, user)
         raise ConfigEntryNotReady
 
+    _async_migrate_device(hass, entry, user, serial_number)
+
+    if export_format != EXPORT_FORMAT_NONE:
+        export_sink = ExportSink(
+            hass,
+            serial_number,
+            export_format,
+            hass.config.path(DOMAIN, "export"),
+            entry.options.get(CONF_EXPORT_MAX_SIZE, DEFAULT_EXPORT_MAX_SIZE)
+            * 1024
+            * 1024,
+        )
+        export_sink.async_start()
+        hass.data[DOMAIN][entry.entry_id]["export_sink"] = export_sink
+
+    if "recorder" in hass.config.components:
+        battery_voltage_history = BatteryVoltageHistory(hass, controller, serial_number)
+        await battery_voltage_history.async_start()
+        hass.data[DOMAIN][entry.entry_id][
+            "battery_voltage_history"
+        ] = battery_voltage_history
+
+    async def _async_recheck_external_ev(_now) -> None:
+        previous = controller.has_external_ev
+        if await _async_check_external_ev(controller) != previous:
+            _LOGGER.info("EV charger of %s changed, reloading", serial_number)
+            hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_recheck_external_ev, timedelta(seconds=EV_CHECK_INTERVAL)
+        )
+    )
+
+    await _async_setup_tracing(hass, entry, hass.data[DOMAIN][entry.entry_id])
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def _async_setup_tracing(
+    hass: HomeAssistant, entry: ConfigEntry, entry_data: dict
+) -> None:
+    """Send the refresh cycle traces to the sink chosen in the options."""
+    coordinator = entry_data["coordinator"]
+    coordinator.tracer = None
+    if entry_data["trace_sink"] is not None:
+        await hass.async_add_executor_job(entry_data["trace_sink"].close)
+        entry_data["trace_sink"] = None
+
+    mode = entry.options.get(CONF_TRACE, DEFAULT_TRACE)
+    if mode == TRACE_LOGGER:
+        logger = logging.getLogger(f"{__name__}.trace")
+        # Home Assistant logs WARNING and above by default, the lines are
+        # INFO, a level set in the logger configuration is left alone
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+        coordinator.tracer = Tracer(coordinator.serial_number, logger_sink(logger))
+    elif mode == TRACE_FILE:
+        sink = await hass.async_add_executor_job(
+            RotatingFileSink,
+            hass.config.path(
+                DOMAIN, "traces", f"{slugify(coordinator.serial_number)}.jsonl"
+            ),
+            TRACE_MAX_SIZE * 1024 * 1024,
+        )
+        entry_data["trace_sink"] = sink
+        coordinator.tracer = Tracer(coordinator.serial_number, sink)
+
+
+@callback
+def _async_migrate_device(
+    hass: HomeAssistant, entry: ConfigEntry, user: str, serial_number: str
+) -> None:
+    """Move the entry off the device it used to share with the other plants.
+
+    Devices were identified by the username, which merged the plants of an
+    account into one device. A device only used by the entry keeps its id
+    and gets the serial number. Otherwise the entities of the entry move to
+    a device of their own first, leaving the old device would remove them.
+    """
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_device(
+        identifiers={(DOMAIN, "AtonStorage " + user)}
+    )
+    if device is None or entry.entry_id not in device.config_entries:
+        return
+    if device.config_entries == {entry.entry_id}:
+        device_registry.async_update_device(
+            device.id, new_identifiers={(DOMAIN, serial_number)}
+        )
+        return
+
+    new_device = device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id,
+        **hass.data[DOMAIN][entry.entry_id]["device_info"],
+    )
+    entity_registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        if entity.device_id == device.id:
+            entity_registry.async_update_entity(
+                entity.entity_id, device_id=new_device.id
+            )
+    device_registry.async_update_device(
+        device.id, remove_config_entry_id=entry.entry_id
+    )
+
+
+def _get_sensors_selected(entry: ConfigEntry) -> list[str]:
+    """Return the selected sensors, the options override the initial setup."""
+    return entry.options.get(
+        CONF_MONITORED_VARIABLES,
+        entry.data.get(CONF_MONITORED_VARIABLES, AVAILABLE_SENSORS),
+    )
+
+
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply the new options in place, reload only when it cannot be helped."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    previous = entry_data["options"]
+    entry_data["options"] = dict(entry.options)
+
+    if any(
+        entry.options.get(key, default) != previous.get(key, default)
+        for key, default in RELOAD_OPTIONS.items()
+    ):
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+
+    http2 = entry.options.get(CONF_HTTP2, DEFAULT_HTTP2)
+    if http2 != previous.get(CONF_HTTP2, DEFAULT_HTTP2):
+        await _async_replace_transport(hass, entry_data["username"], http2)
+
+    coordinator = entry_data["coordinator"]
+    scan_interval = timedelta(
+        seconds=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    )
+    if scan_interval != coordinator.scan_interval:
+        coordinator.async_set_scan_interval(scan_interval)
+    if entry.options.get(CONF_TRACE, DEFAULT_TRACE) != previous.get(
+        CONF_TRACE, DEFAULT_TRACE
+    ):
+        await _async_setup_tracing(hass, entry, entry_data)
+    _get_rate_limiter(hass, entry)
+
+    sensors_selected = _get_sensors_selected(entry)
+    removed = set(entry_data["sensors_selected"]) - set(sensors_selected)
+    added = [
+        name for name in sensors_selected if name not in entry_data["sensors_selected"]
+    ]
+    entry_data["sensors_selected"] = sensors_selected
+
+    for entity in list(entry_data["entities"]):
+        name = getattr(entity, "selection_name", entity.entity_description.name)
+        if name in removed:
+            entry_data["entities"].remove(entity)
+            # the registry entry keeps the customizations for a new selection
+            await entity.async_remove()
+        elif hasattr(entity, "async_apply_options"):
+            entity.async_apply_options(entry.options)
+
+    if added:
+        for async_add_selected in entry_data["entity_adders"]:
+            async_add_selected(added)
+
+
+async def _async_check_external_ev(controller: AtonStorage) -> bool | None:
+    """Detect the EV charger, keep the last known answer on failure."""
+    try:
+        return await controller.check_external_ev()
+    except Exception as exc:  # pylint: disable=broad-except
+        _LOGGER.warning("Unable to detect the EV charger: %s", exc)
+        return controller.has_external_ev
+
+
+def _get_rate_limiter(hass: HomeAssistant, entry: ConfigEntry) -> RateLimiter:
+    """Return the rate limiter shared by every entry of the same account."""
+    rate = entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT) / 60
+    max_concurrency = entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+
+    limiters = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    key = (entry.data.get(CONF_USERNAME), API_HOST)
+    if key in limiters:
+        limiters[key].configure(rate, RATE_LIMIT_BURST, max_concurrency)
+    else:
+        limiters[key] = RateLimiter(rate, RATE_LIMIT_BURST, max_concurrency)
+    return limiters[key]
+
+
+async def _async_acquire_transport(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> httpx.AsyncClient:
+    """Return the HTTP client shared by every entry of the same account.
+
+    The first entry of an account decides whether HTTP/2 is used.
+    """
+    transports = hass.data.setdefault(DATA_TRANSPORTS, {})
+    user = entry.data.get(CONF_USERNAME)
+    if user not in transports:
+        client = await hass.async_add_executor_job(
+            create_async_client, entry.options.get(CONF_HTTP2, DEFAULT_HTTP2)
+        )
+        if user in transports:
+            # another entry of the account won the race
+            await client.aclose()
+        else:
+            transports[user] = [client, 0]
+    transports[user][1] += 1
+    return transports[user][0]
+
+
+async def _async_replace_transport(
+    hass: HomeAssistant, user: str, http2: bool
+) -> None:
+    """Switch every entry of an account to a new HTTP client.
+
+    The client is shared, so the HTTP/2 setting applies to the account.
+    """
+    transports = hass.data.get(DATA_TRANSPORTS, {})
+    if user not in transports:
+        return
+    client = await hass.async_add_executor_job(create_async_client, http2)
+    previous = transports[user][0]
+    transports[user][0] = client
+    for entry_data in hass.data[DOMAIN].values():
+        if entry_data["username"] == user:
+            entry_data["controller"].set_async_client(client)
+    await previous.aclose()
+
+
+async def _async_release_transport(hass: HomeAssistant, user: str) -> None:
+    """Close the HTTP client of an account once its last entry is gone."""
+    transports = hass.data.get(DATA_TRANSPORTS, {})
+    if user not in transports:
+        return
+    transports[user][1] -= 1
+    if transports[user][1] <= 0:
+        client, _ = transports.pop(user)
+        await client.aclose()
+
+
+def _get_poll_scheduler(hass: HomeAssistant) -> PollScheduler:
+    """Return the scheduler spreading the polls of every entry."""
+    if DATA_POLL_SCHEDULER not in hass.data:
+        hass.data[DATA_POLL_SCHEDULER] = PollScheduler()
+    return hass.data[DATA_POLL_SCHEDULER]
+
+
+def _get_history_cache(hass: HomeAssistant) -> HistoryCache:
+    """Return the history cache shared by every entry."""
+    if DATA_HISTORY_CACHE not in hass.data:
+        hass.data[DATA_HISTORY_CACHE] = HistoryCache(
+            hass.config.path(DOMAIN, "cache"), HISTORY_CACHE_MAX_SIZE * 1024 * 1024
+        )
+    return hass.data[DATA_HISTORY_CACHE]
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry_data["coordinator"].async_stop_live_mode()
+        entry_data["coordinator"].async_stop_profiling()
+        entry_data["controller"].stop_recording()
+        if entry_data["battery_voltage_history"] is not None:
+            entry_data["battery_voltage_history"].async_stop()
+        if entry_data["export_sink"] is not None:
+            await entry_data["export_sink"].async_stop()
+        await _async_release_transport(hass, entry_data["username"])
+        if entry_data["trace_sink"] is not None:
+            await hass.async_add_executor_job(entry_data["trace_sink"].close)
 
     return unload_ok
 
@@ -135,11 +499,228 @@ class AtonStorageUpdateCoordinator(DataUpdateCoordinator):
         self.bridge = bridge
         self.serial_number = serial_number
         self.update_interval = update_interval
+        self.scan_interval = update_interval
+        self._unsub_live_mode = None
+        self._last_listeners_update = None
+        self._cassette_cycles = 0
+        self._profile_cycles = 0
+        self.snapshots: deque[dict] = deque(maxlen=SNAPSHOT_RING_SIZE)
+        self.tracer: Tracer | None = None
+        self.poll_scheduler: PollScheduler | None = None
+
+    @callback
+    def async_set_scan_interval(self, scan_interval: timedelta) -> None:
+        """Change the scan interval, a running live burst keeps its own."""
+        self.scan_interval = scan_interval
+        self.bridge.interval = int(scan_interval.total_seconds())
+        if not self.live_mode:
+            self.update_interval = scan_interval
+            self._schedule_refresh()
+
+    @property
+    def poll_slot(self) -> tuple[int, int] | None:
+        """Return the polling slot of the plant and the number of slots."""
+        if self.poll_scheduler is None:
+            return None
+        return self.poll_scheduler.slot(self.serial_number)
+
+    @property
+    def poll_offset(self) -> float | None:
+        """Return the seconds into every scan interval at which the plant polls."""
+        if self.poll_scheduler is None:
+            return None
+        return self.poll_scheduler.offset(
+            self.serial_number, self.scan_interval.total_seconds()
+        )
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll in the slot of the plant.
+
+        A live burst polls as soon as possible and is not staggered.
+        """
+        super()._schedule_refresh()
+        if self._unsub_refresh is None or self.live_mode or self.poll_scheduler is None:
+            return
+        self._unsub_refresh()
+        delay = self.poll_scheduler.next_poll(
+            self.serial_number, self.update_interval.total_seconds(), time()
+        )
+        self._unsub_refresh = async_call_later(
+            self.hass, delay, self._handle_refresh_interval
+        )
+
+    @property
+    def live_mode(self) -> bool:
+        """Return True while a live burst is running."""
+        return self._unsub_live_mode is not None
+
+    async def async_start_live_mode(self, interval: int, duration: int) -> None:
+        """Poll every `interval` seconds for `duration` seconds, then revert."""
+        if self._unsub_live_mode is not None:
+            self._unsub_live_mode()
+
+        _LOGGER.info(
+            "Starting live mode for %s: every %ss for %ss",
+            self.serial_number,
+            interval,
+            duration,
+        )
+        self.bridge.live_interval = interval
+        self.update_interval = timedelta(seconds=interval)
+        self._unsub_live_mode = async_call_later(
+            self.hass, duration, self._async_live_mode_expired
+        )
+        await self.async_refresh()
+
+    @callback
+    def _async_live_mode_expired(self, _now) -> None:
+        """Revert to the configured scan interval once the burst is over."""
+        self._unsub_live_mode = None
+        self.async_stop_live_mode()
+
+    @callback
+    def async_stop_live_mode(self) -> None:
+        """Stop a running live burst."""
+        if self._unsub_live_mode is not None:
+            self._unsub_live_mode()
+            self._unsub_live_mode = None
+
+        if self.bridge.live_interval is not None:
+            _LOGGER.info("Stopping live mode for %s", self.serial_number)
+        self.bridge.live_interval = None
+        self.update_interval = self.scan_interval
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update entities, at most once per scan interval while in live mode.
+
+        Live samples are only published on the snapshot signal so that the
+        recorder keeps its usual cadence during a burst.
+        """
+        now = monotonic()
+        if (
+            self.live_mode
+            and self._last_listeners_update is not None
+            and now - self._last_listeners_update < self.scan_interval.total_seconds()
+        ):
+            return
+        self._last_listeners_update = now
+        with span("fan_out", listeners=len(self._listeners)):
+            super().async_update_listeners()
+
+    @callback
+    def async_start_recording(self, cycles: int) -> None:
+        """Record the HTTP exchanges of the next `cycles` refreshes."""
+        _LOGGER.info(
+            "Recording the next %s refreshes of %s", cycles, self.serial_number
+        )
+        self._cassette_cycles = cycles
+        self.bridge.start_recording()
+
+    async def _async_finish_recording(self) -> None:
+        recorder = self.bridge.stop_recording()
+        if recorder is None:
+            return
+
+        path = self.hass.config.path(
+            DOMAIN,
+            "cassettes",
+            f"{self.serial_number}-{dt_util.now().strftime('%Y%m%d%H%M%S')}.jsonl",
+        )
+
+        def _dump():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            recorder.dump(path)
+
+        await self.hass.async_add_executor_job(_dump)
+        _LOGGER.info("Cassette for %s written to %s", self.serial_number, path)
+
+    @callback
+    def async_start_profiling(self, cycles: int) -> None:
+        """Profile the next `cycles` refresh and entity update cycles."""
+        global _profiler_owner  # pylint: disable=global-statement
+
+        if _profiler_owner is None and _profiler_active():
+            raise HomeAssistantError("Another profiler is already running")
+        if _profiler_owner not in (None, self):
+            raise HomeAssistantError(
+                f"AtonStorage {_profiler_owner.serial_number} is already profiled"
+            )
+        _LOGGER.info(
+            "Profiling the next %s refreshes of %s", cycles, self.serial_number
+        )
+        _profiler_owner = self
+        self._profile_cycles = cycles
+
+    @callback
+    def async_stop_profiling(self) -> None:
+        """Stop profiling without writing the profile."""
+        global _profiler_owner  # pylint: disable=global-statement
+
+        if _profiler_owner is self:
+            _profiler_owner = None
+            _PROFILER.clear()
+        self._profile_cycles = 0
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        """Refresh data and update entities, traced when a tracer is set."""
+        if self.tracer is None:
+            return await self._async_profiled_refresh(*args, **kwargs)
+        with self.tracer.cycle():
+            await self._async_profiled_refresh(*args, **kwargs)
+
+    async def _async_profiled_refresh(self, *args, **kwargs) -> None:
+        """Refresh data and update entities, under the profiler when active.
+
+        The profiler sees everything running in the event loop while a cycle
+        awaits the server, not only this integration.
+        """
+        if _profiler_owner is not self:
+            return await super()._async_refresh(*args, **kwargs)
+
+        try:
+            _PROFILER.enable()
+        except ValueError as exc:
+            _LOGGER.warning("Unable to profile %s: %s", self.serial_number, exc)
+            self.async_stop_profiling()
+            return await super()._async_refresh(*args, **kwargs)
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            _PROFILER.disable()
+
+        self._profile_cycles -= 1
+        if self._profile_cycles <= 0:
+            path = self.hass.config.path(
+                DOMAIN,
+                "profiles",
+                f"{self.serial_number}-{dt_util.now().strftime('%Y%m%d%H%M%S')}.prof",
+            )
+
+            def _dump():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _PROFILER.dump_stats(path)
+
+            try:
+                await self.hass.async_add_executor_job(_dump)
+            finally:
+                self.async_stop_profiling()
+            _LOGGER.info("Profile of %s written to %s", self.serial_number, path)
 
     async def _async_update_data(self):
         """Fetch data from AtonStorage."""
+        try:
+            await self._async_fetch_data()
+        finally:
+            if self._cassette_cycles:
+                self._cassette_cycles -= 1
+                if not self._cassette_cycles:
+                    await self._async_finish_recording()
+
+    async def _async_fetch_data(self):
         _LOGGER.debug("refreshing data")
-        async with async_timeout.timeout(self.update_interval.seconds):
+        async with async_timeout.timeout(max(self.update_interval.seconds, TIMEOUT)):
             try:
                 await self.bridge.refresh()
             except Exception as err:
@@ -148,3 +729,19 @@ class AtonStorageUpdateCoordinator(DataUpdateCoordinator):
                 ) from err
             if not self.bridge.status:
                 raise UpdateFailed("Error fetching AtonStorage state")
+
+        if self.snapshots and self.snapshots[-1] is self.bridge.data:
+            # coalesced with a refresh already dispatched
+            return
+        self.snapshots.append(self.bridge.data)
+        async_dispatcher_send(
+            self.hass, SIGNAL_SNAPSHOT.format(self.serial_number), self.bridge.data
+        )
+
+
+def _profiler_active() -> bool:
+    """Whether a profiler, cProfile or another one, is running."""
+    monitoring = getattr(sys, "monitoring", None)
+    if monitoring is not None:
+        return monitoring.get_tool(monitoring.PROFILER_ID) is not None
+    return sys.getprofile() is not None
@@ -0,0 +1,9 @@
+"""AtonTC portal client, usable without Home Assistant."""
+from .client import (  # noqa: F401
+    AtonStorageConnectionError,
+    AtonTCClient,
+    InvalidUsernameOrPasswordError,
+    SerialNumberRequiredError,
+    UsernameAndPasswordRequiredError,
+)
+from .plants import Plant, parse_plants  # noqa: F401
@@ -0,0 +1,127 @@
+"""Run refresh cycles against the AtonTC portal and print their timings.
+
+Run from the `custom_components/atonstorage` folder:
+
+    python -m atontc --user USER --serial SERIAL --cycles 10
+    python -m atontc --serial SERIAL --replay cassette.jsonl --speed 0
+    python -m atontc --user USER --plants
+
+The password is read from the ATONTC_PASSWORD environment variable when
+`--password` is omitted.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+from .cassette import ReplayClient
+from .client import AtonTCClient
+from .trace import Tracer
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m atontc", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--user", default="")
+    parser.add_argument("--password", default=os.environ.get("ATONTC_PASSWORD", ""))
+    parser.add_argument("--serial")
+    parser.add_argument(
+        "--plants", action="store_true", help="list the plants of the account"
+    )
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument(
+        "--pause", type=float, default=0, help="seconds between two cycles"
+    )
+    parser.add_argument("--replay", help="cassette to replay instead of the portal")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed, 0 for no latency"
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="also replay the recorded time between requests",
+    )
+    parser.add_argument("--record", help="write the exchanges to this cassette")
+    parser.add_argument("--http2", action="store_true", help="needs the h2 package")
+    parser.add_argument(
+        "--trace", action="store_true", help="print the spans of every cycle"
+    )
+    args = parser.parse_args(argv)
+    if args.serial is None and not args.plants:
+        parser.error("--serial is required unless --plants is given")
+    return args
+
+
+async def _run(args) -> int:
+    if args.replay:
+        async_client = ReplayClient.from_file(args.replay, args.speed, args.realtime)
+    else:
+        # pylint: disable-next=import-outside-toplevel
+        from .transport import create_async_client
+
+        async_client = create_async_client(http2=args.http2)
+
+    client = AtonTCClient(
+        args.user,
+        args.password,
+        args.serial,
+        {"interval": 15, "min_refresh_interval": 0},
+        async_client=async_client,
+    )
+    if args.record:
+        client.start_recording()
+
+    if args.plants:
+        try:
+            await client.login()
+        finally:
+            recorder = client.stop_recording()
+            if recorder is not None:
+                recorder.dump(args.record)
+            if not args.replay:
+                await async_client.aclose()
+        for plant in client.plants:
+            print(f"{plant.serial_number}  id={plant.id}  {plant.name or ''}".rstrip())
+        return 0 if client.plants else 1
+
+    tracer = (
+        Tracer(args.serial, lambda line: print(line, file=sys.stderr))
+        if args.trace
+        else None
+    )
+    timings = []
+    try:
+        for cycle in range(args.cycles):
+            started = time.perf_counter()
+            with tracer.cycle() if tracer else contextlib.nullcontext():
+                await client.refresh()
+            elapsed = (time.perf_counter() - started) * 1000
+            timings.append(elapsed)
+            print(f"cycle {cycle + 1}: {elapsed:8.1f} ms  status={client.status}")
+            if args.pause and cycle + 1 < args.cycles:
+                await asyncio.sleep(args.pause)
+    finally:
+        recorder = client.stop_recording()
+        if recorder is not None:
+            recorder.dump(args.record)
+        if not args.replay:
+            await async_client.aclose()
+
+    if timings:
+        print(
+            f"{len(timings)} cycles: min {min(timings):.1f} ms, "
+            f"mean {statistics.mean(timings):.1f} ms, max {max(timings):.1f} ms"
+        )
+    return 0
+
+
+def main(argv=None) -> int:
+    return asyncio.run(_run(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
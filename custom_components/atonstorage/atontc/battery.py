@@ -0,0 +1,158 @@
+"""Battery charge and discharge rate estimation."""
+from array import array
+
+DEFAULT_WINDOW = 60  # samples, 30 minutes at the default scan interval
+MIN_SAMPLES = 6
+MAX_GAP = 600  # seconds without samples before the window restarts
+# scan intervals without samples before the window restarts, which lets
+# one failed poll and the jitter of the portal timestamps through
+MAX_GAP_INTERVALS = 3
+MIN_SOC_SPAN = 2  # % of state of charge needed to fit the capacity
+
+
+class BatteryEstimator:
+    """Sliding window least squares fits of the battery state of charge.
+
+    Every sample adds the state of charge and the energy moved through the
+    battery since the first sample. Two lines are fitted over the window:
+    state of charge against time, which gives the charge or discharge rate,
+    and energy against state of charge, which gives the usable capacity.
+    The sums of both fits are updated in O(1) per sample and recomputed
+    from the arrays once per window turn, which keeps them precise.
+    """
+
+    __slots__ = (
+        "_window",
+        "max_gap",
+        "_time",
+        "_soc",
+        "_energy",
+        "_size",
+        "_next",
+        "_origin",
+        "_last_time",
+        "_last_power",
+        "_total_energy",
+        "_sums",
+    )
+
+    def __init__(self, window: int = DEFAULT_WINDOW, max_gap: float = MAX_GAP) -> None:
+        """Initialize."""
+        self._window = window
+        self.max_gap = max_gap
+        self._time = array("d", bytes(8 * window))
+        self._soc = array("d", bytes(8 * window))
+        self._energy = array("d", bytes(8 * window))
+        self.reset()
+
+    def set_interval(self, interval: float) -> None:
+        """Follow the scan interval, in seconds, of the samples."""
+        self.max_gap = MAX_GAP_INTERVALS * interval
+
+    def reset(self) -> None:
+        self._size = 0
+        self._next = 0
+        self._origin = None
+        self._last_time = None
+        self._last_power = 0.0
+        self._total_energy = 0.0
+        # n, t, s, tt, ts, e, ss, se
+        self._sums = [0.0] * 8
+
+    def _accumulate(self, t: float, s: float, e: float, sign: int) -> None:
+        sums = self._sums
+        sums[0] += sign
+        sums[1] += sign * t
+        sums[2] += sign * s
+        sums[3] += sign * t * t
+        sums[4] += sign * t * s
+        sums[5] += sign * e
+        sums[6] += sign * s * s
+        sums[7] += sign * s * e
+
+    def _rebase(self) -> None:
+        """Recompute the sums relative to the oldest sample."""
+        oldest = self._next if self._size == self._window else 0
+        origin = self._time[oldest]
+        for index in range(self._size):
+            self._time[index] -= origin
+        self._origin += origin
+        self._sums = [0.0] * 8
+        for index in range(self._size):
+            self._accumulate(
+                self._time[index], self._soc[index], self._energy[index], 1
+            )
+
+    def add(self, timestamp: float, soc: float, power: float) -> None:
+        """Add a sample, `power` in W and positive while charging."""
+        if self._last_time is not None and (
+            timestamp <= self._last_time or timestamp - self._last_time > self.max_gap
+        ):
+            if timestamp <= self._last_time:
+                return
+            self.reset()
+
+        if self._origin is None:
+            self._origin = timestamp
+        else:
+            # left Riemann sum of the battery power, in Wh
+            self._total_energy += (
+                self._last_power * (timestamp - self._last_time) / 3600
+            )
+        self._last_time = timestamp
+        self._last_power = power
+
+        if self._size == self._window:
+            index = self._next
+            self._accumulate(
+                self._time[index], self._soc[index], self._energy[index], -1
+            )
+        else:
+            self._size += 1
+
+        t = timestamp - self._origin
+        self._time[self._next] = t
+        self._soc[self._next] = soc
+        self._energy[self._next] = self._total_energy
+        self._accumulate(t, soc, self._total_energy, 1)
+        self._next = (self._next + 1) % self._window
+        if self._next == 0:
+            self._rebase()
+
+    @property
+    def rate(self) -> float | None:
+        """Return the fitted state of charge rate in % per hour."""
+        n, t, s, tt, ts = self._sums[:5]
+        if n < MIN_SAMPLES:
+            return None
+        variance = n * tt - t * t
+        if variance <= 0:
+            return None
+        return (n * ts - t * s) / variance * 3600
+
+    @property
+    def usable_capacity(self) -> float | None:
+        """Return the fitted usable capacity in kWh."""
+        n, s, e, ss, se = (self._sums[i] for i in (0, 2, 5, 6, 7))
+        if n < MIN_SAMPLES:
+            return None
+        variance = n * ss - s * s
+        # the state of charge must have moved to tell anything
+        if variance <= 0 or n * n * MIN_SOC_SPAN**2 > 12 * variance:
+            return None
+        wh_per_percent = (n * se - s * e) / variance
+        return wh_per_percent * 100 / 1000 if wh_per_percent > 0 else None
+
+    def time_to_full(self, soc: float) -> float | None:
+        """Return the minutes left until the battery is full, if charging."""
+        rate = self.rate
+        if rate is None or rate <= 0:
+            return None
+        return max(0.0, 100 - soc) / rate * 60
+
+    def time_to_empty(self, soc: float, reserve: float = 0) -> float | None:
+        """Return the minutes left until `reserve` %, if discharging."""
+        rate = self.rate
+        if rate is None or rate >= 0:
+            return None
+        return max(0.0, soc - reserve) / -rate * 60
@@ -0,0 +1,114 @@
+"""On-disk cache of AtonTC history responses."""
+import gzip
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_OPEN = ".gz"
+_CLOSED = ".closed.gz"
+
+
+class HistoryCache:
+    """Compressed, size capped, least recently used response cache.
+
+    Entries are keyed by plant, endpoint and period. An entry stored after
+    its period closed never changes and never expires. An entry stored
+    while its period was still open expires after the `ttl` passed to
+    `get`, also once the period has closed, so a partial response is never
+    kept for good.
+
+    Methods do blocking I/O and are meant to run in executor threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize."""
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # name -> compressed size, time stored, stored after the period closed
+        self._index: OrderedDict[str, tuple[int, float, bool]] | None = None
+        self._size = 0
+
+    @staticmethod
+    def _name(key: tuple) -> str:
+        return re.sub(r"[^A-Za-z0-9.-]", "_", "_".join(map(str, key)))
+
+    def _path(self, name: str, closed: bool) -> str:
+        return os.path.join(self._directory, name + (_CLOSED if closed else _OPEN))
+
+    def _load_index(self) -> None:
+        """Read the existing entries, oldest access first."""
+        os.makedirs(self._directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self._directory):
+            if not entry.is_file() or not entry.name.endswith(_OPEN):
+                continue
+            closed = entry.name.endswith(_CLOSED)
+            name = entry.name[: -len(_CLOSED if closed else _OPEN)]
+            stat = entry.stat()
+            entries.append((stat.st_mtime, name, stat.st_size, closed))
+        self._index = OrderedDict()
+        self._size = 0
+        for mtime, name, size, closed in sorted(entries):
+            if name in self._index:
+                # left by an interrupted put, the newest one wins
+                self._remove(name)
+            self._index[name] = (size, mtime, closed)
+            self._size += size
+
+    def get(self, key: tuple, ttl: float | None = None) -> bytes | None:
+        """Return the cached payload, None when missing or expired.
+
+        Entries stored while their period was open expire after `ttl`
+        seconds, never when `ttl` is None.
+        """
+        name = self._name(key)
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            if name not in self._index:
+                return None
+            _, stored, closed = self._index[name]
+            if not closed and ttl is not None and time.time() - stored > ttl:
+                return None
+            try:
+                with gzip.open(self._path(name, closed), "rb") as file:
+                    payload = file.read()
+            except (OSError, EOFError):
+                self._remove(name)
+                return None
+            self._index.move_to_end(name)
+            return payload
+
+    def put(self, key: tuple, payload: bytes, closed: bool = False) -> None:
+        """Store a payload and evict the least recently used entries.
+
+        `closed` tells that the period of the payload is over, so that the
+        payload is final.
+        """
+        name = self._name(key)
+        path = self._path(name, closed)
+        data = gzip.compress(payload)
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            if name in self._index:
+                self._remove(name)
+            with open(path + ".tmp", "wb") as file:
+                file.write(data)
+            os.replace(path + ".tmp", path)
+            self._index[name] = (len(data), time.time(), closed)
+            self._size += len(data)
+
+            while self._size > self._max_bytes and len(self._index) > 1:
+                self._remove(next(iter(self._index)))
+
+    def _remove(self, name: str) -> None:
+        size, _, closed = self._index.pop(name)
+        self._size -= size
+        try:
+            os.remove(self._path(name, closed))
+        except FileNotFoundError:
+            pass
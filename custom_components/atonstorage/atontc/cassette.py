@@ -0,0 +1,191 @@
+"""Record and replay of AtonTC HTTP exchanges.
+
+A cassette is a JSON lines file with one exchange per line:
+
+    {"t": 0.0, "elapsed": 0.21, "method": "GET", "url": "...",
+     "status": 200, "headers": {...}, "body": "..."}
+
+`t` is the offset of the request from the start of the recording and
+`elapsed` the time the server took to answer, both in seconds.
+
+The credentials are redacted from the URLs and bodies, inside the string
+values of JSON bodies so the payloads stay valid. Secrets shorter than
+`MIN_SECRET_LENGTH` cannot be told apart from data and are left as is.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+REDACTED = "**REDACTED**"
+MIN_SECRET_LENGTH = 6
+
+_REDACTED_HEADERS = ("set-cookie", "cookie")
+
+
+class CassetteHeaders(dict):
+    """Case insensitive response headers."""
+
+    def __init__(self, headers=None) -> None:
+        super().__init__((key.lower(), value) for key, value in (headers or {}).items())
+
+    def __getitem__(self, key: str):
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key.lower())
+
+    def get(self, key: str, default=None):
+        return super().get(key.lower(), default)
+
+
+class CassetteResponse:
+    """The subset of an httpx response used by the controller."""
+
+    def __init__(self, status: int, headers: dict, body: str) -> None:
+        """Initialize."""
+        self.status_code = status
+        self.headers = CassetteHeaders(headers)
+        self.content = body.encode("utf-8")
+        self.cookies = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+
+class RecordingClient:
+    """Wrap an async HTTP client and keep every exchange in memory."""
+
+    def __init__(self, client, secrets=()) -> None:
+        """Initialize."""
+        self.client = client
+        self.entries: list[dict] = []
+        self._secrets = [
+            secret for secret in secrets if secret and len(secret) >= MIN_SECRET_LENGTH
+        ]
+        self._start = time.monotonic()
+
+    def _redact(self, text: str) -> str:
+        for secret in self._secrets:
+            text = text.replace(secret, REDACTED)
+        return text
+
+    def _redact_value(self, value):
+        if isinstance(value, str):
+            return self._redact(value)
+        if isinstance(value, list):
+            return [self._redact_value(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._redact_value(item) for key, item in value.items()}
+        return value
+
+    def _redact_body(self, body: str) -> str:
+        if not any(secret in body for secret in self._secrets):
+            return body
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._redact(body)
+        return json.dumps(self._redact_value(payload), ensure_ascii=False)
+
+    async def request(self, method: str, url: str, **kwargs):
+        started = time.monotonic()
+        response = await self.client.request(method, url, **kwargs)
+        elapsed = time.monotonic() - started
+
+        headers = {
+            key: REDACTED if key.lower() in _REDACTED_HEADERS else value
+            for key, value in response.headers.items()
+        }
+        self.entries.append(
+            {
+                "t": round(started - self._start, 4),
+                "elapsed": round(elapsed, 4),
+                "method": method,
+                "url": self._redact(url),
+                "status": response.status_code,
+                "headers": headers,
+                "body": self._redact_body(response.content.decode("utf-8", "replace")),
+            }
+        )
+        return response
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    def dump(self, path: str) -> None:
+        """Write the recorded exchanges to a cassette file."""
+        with open(path, "w", encoding="utf-8") as file:
+            for entry in self.entries:
+                file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+class ReplayClient:
+    """Serve the exchanges of a cassette in order.
+
+    Requests are matched on method and URL path so that the date and
+    timestamp parameters of a live request do not need to match the
+    recording. `speed` divides the recorded times, `0` disables them.
+
+    By default only the response latency (`elapsed`) is replayed. With
+    `realtime` a response is also held back until its recorded offset `t`
+    since the first replayed request, which reproduces the pacing of the
+    recording when the caller asks faster than it did.
+    """
+
+    def __init__(
+        self, entries: list[dict], speed: float = 1.0, realtime: bool = False
+    ) -> None:
+        """Initialize."""
+        self._entries = entries
+        self._speed = speed
+        self._realtime = realtime
+        self._position = 0
+        self._start: float | None = None
+
+    @classmethod
+    def from_file(
+        cls, path: str, speed: float = 1.0, realtime: bool = False
+    ) -> "ReplayClient":
+        with open(path, encoding="utf-8") as file:
+            entries = [json.loads(line) for line in file if line.strip()]
+        return cls(entries, speed, realtime)
+
+    def rewind(self) -> None:
+        self._position = 0
+        self._start = None
+
+    def _delay(self, entry: dict) -> float:
+        delay = entry["elapsed"] / self._speed
+        if not self._realtime:
+            return delay
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now - entry["t"] / self._speed
+        return max(
+            delay, self._start + (entry["t"] + entry["elapsed"]) / self._speed - now
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        path = urlsplit(url).path
+        for index in range(self._position, len(self._entries)):
+            entry = self._entries[index]
+            if entry["method"] == method and urlsplit(entry["url"]).path == path:
+                break
+        else:
+            raise LookupError(f"No recorded response left for {method} {path}")
+
+        self._position = index + 1
+        if self._speed:
+            await asyncio.sleep(self._delay(entry))
+        return CassetteResponse(entry["status"], entry["headers"], entry["body"])
+
+    async def get(self, url: str, **kwargs) -> CassetteResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> CassetteResponse:
+        return await self.request("POST", url, **kwargs)
@@ -0,0 +1,900 @@
+"""AtonTC portal client, independent of Home Assistant."""
+import asyncio
+import json
+import logging
+import re
+from datetime import date, datetime
+from time import monotonic
+
+from .battery import BatteryEstimator
+from .cassette import RecordingClient
+from .derived import DerivedMetrics, compute_derived
+from .plants import Plant, parse_plants
+from .ratelimit import PRIORITY_BACKGROUND, PRIORITY_LIVE
+from .trace import span
+
+API_HOST = "www.atonstorage.com"
+_BASEURL = f"https://{API_HOST}/atonTC/"
+_LOGIN_ENDPOINT = _BASEURL + "index.php"
+_MONITOR_ENDPOINT = _BASEURL + "get_monitor.php?sn={serial_number}"
+_ENERGY_ENDPOINT = (
+    _BASEURL
+    + "get_energy.php?idImpianto={id}&anno={year}&mese={month}&giorno={day}&intervallo=d"
+)  # tot_pReteOut
+_VBIB_ENDPOINT = _BASEURL + "get_vbib.php?anno={year}&mese={month}&sn={serial_number}"
+_HAS_EV_ENDPOINT = _BASEURL + "hasExternalEV.php?id_impianto={id}"
+_CHECK_TSHIFT_ENDPOINT = _BASEURL + "checkTShift.php?sn={serial_number}"
+_GET_TSHIFT_ENDPOINT = _BASEURL + "getTShift.php?sn={serial_number}"
+_SET_REQUEST_ENDPOINT = (
+    _BASEURL
+    + "set_request.php?request=MONITOR&intervallo={interval}&sn={serial_number}"
+)
+# _ENDPOINT = "https://www.atonstorage.com/atonTC/get_monitor.php?sn={serialNumber}&_={timestamp}"
+# https://www.atonstorage.com/atonTC/set_request.php?sn={serialNumber}&request=MONITOR&intervallo=15&_={timestamp}
+# https://www.atonstorage.com/atonTC/getAlarmDesc.php?sn={serialNumber}&_={timestamp}
+# https://www.atonstorage.com/atonTC/hasExternalEV.php?id_impianto=151762966&_={timestamp}
+# https://www.atonstorage.com/atonTC/get_monitorToday.php?&sn={serialNumber}&_={timestamp}
+# https://www.atonstorage.com/atonTC/get_energy.php?anno=2022&mese=11&giorno=9&idImpianto=151762966&intervallo=d&potNom=3500&batNom=3500&sn={serialNumber}&_={timestamp}
+# https://www.atonstorage.com/atonTC/get_vbib.php?anno=2022&mese=11&sn={serialNumber}&_={timestamp}
+# https://www.atonstorage.com/atonTC/get_allarmi_oggi.php?sn={serialNumber}&idImpianto=151762966&tipoUtente=1&_={timestamp}
+# https://www.atonstorage.com/atonTC/checkTShift.php?sn={serialNumber}&_={timestamp}
+# https://www.atonstorage.com/atonTC/getTShift.php?sn={serialNumber}&_={timestamp}
+
+# monitor fields only meaningful when an external EV charger is installed
+EV_KEYS = (
+    "num_EV",
+    "SoC_EV",
+    "stato_EV",
+    "setp_EV",
+    "potenza_EV",
+    "kmh",
+    "e_ciclo_EV",
+    "km",
+    "perc_carica",
+)
+
+# seconds within which a refresh returns the current snapshot
+MIN_REFRESH_INTERVAL = 5
+
+# seconds the history of the current day or month is served from the cache
+HISTORY_CACHE_TTL = 300
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AtonTCClient:
+    """Fetch and decode the data of an AtonStorage plant.
+
+    `async_client` is any httpx.AsyncClient compatible object, which makes
+    the client usable outside Home Assistant and with recorded cassettes.
+    """
+
+    _session = None
+    data = None
+    _async_client = None
+    _id_plant = None
+    derived: DerivedMetrics = None
+    battery: BatteryEstimator = None
+    _interval = None
+    live_interval = None
+    has_external_ev: bool | None = None
+    plants: list[Plant] = None
+
+    def __init__(self, user, password, serial_number, opts, async_client):
+        """Initialize."""
+
+        # if user is None or password is None:
+        #    raise UsernameAndPasswordRequiredError
+
+        # without a serial number the client can only log in and list the
+        # plants of the account, refresh() raises SerialNumberRequiredError
+        self._user = user
+        self._password = password
+        self._serial_number = serial_number
+        # self._id_plant = serial_number    #TODO
+        self._opts = opts
+        self.battery = BatteryEstimator()
+        self.interval = opts.get("interval")
+        self._session = None
+        self._async_client = async_client
+        self.rate_limiter = opts.get("rate_limiter")
+        self._history_cache = opts.get("history_cache")
+        self.min_refresh_interval = opts.get(
+            "min_refresh_interval", MIN_REFRESH_INTERVAL
+        )
+        self._refresh_task: asyncio.Task | None = None
+        self._last_refresh: float | None = None
+        self.plants = []
+
+    @property
+    def interval(self) -> int | None:
+        """The scan interval in seconds."""
+        return self._interval
+
+    @interval.setter
+    def interval(self, interval: int | None) -> None:
+        self._interval = interval
+        if interval:
+            self.battery.set_interval(interval)
+
+    @property
+    def recording(self) -> bool:
+        return isinstance(self._async_client, RecordingClient)
+
+    def start_recording(self) -> None:
+        """Record every following exchange, with the credentials redacted."""
+        if not self.recording:
+            self._async_client = RecordingClient(
+                self._async_client, secrets=(self._user, self._password)
+            )
+
+    def set_async_client(self, async_client) -> None:
+        """Use another HTTP client, a running recording goes on through it."""
+        if self.recording:
+            self._async_client.client = async_client
+        else:
+            self._async_client = async_client
+
+    def stop_recording(self) -> RecordingClient | None:
+        """Stop recording and return the recorder."""
+        if not self.recording:
+            return None
+        recorder = self._async_client
+        self._async_client = recorder.client
+        return recorder
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        priority=PRIORITY_LIVE,
+        span_name: str = "request",
+        **kwargs,
+    ):
+        """Send a request through the account rate limiter."""
+        with span(span_name) as attributes:
+            if self.rate_limiter is None:
+                response = await self._async_client.request(method, url, **kwargs)
+            else:
+                async with self.rate_limiter.acquire(priority):
+                    response = await self._async_client.request(method, url, **kwargs)
+            attributes["status"] = response.status_code
+            attributes["bytes"] = len(response.content or b"")
+            return response
+
+    async def login(self) -> bool:
+        """Login to Aton server."""
+        with span("login"):
+            return await self._login()
+
+    async def _login(self) -> bool:
+        login = await self._request(
+            "GET", _LOGIN_ENDPOINT, span_name="login_page", timeout=60
+        )
+
+        login = await self._request(
+            "POST",
+            _LOGIN_ENDPOINT,
+            span_name="login_post",
+            timeout=60,
+            data="username={user}&password={password}".format(
+                user=self._user, password=self._password
+            ),
+            cookies=login.cookies,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+        if login.headers is not None and login.headers["Set-Cookie"] is not None:
+            self._session = login.cookies
+            _LOGGER.info("Logged in")
+
+            page = login.content.decode("utf-8")
+            self.plants = parse_plants(page)
+            _LOGGER.debug("Plants: %s", self.plants)
+
+            # get plant id, the page declares the default plant of the account
+            plant = next(
+                (p for p in self.plants if p.serial_number == self._serial_number),
+                None,
+            )
+            if plant is not None:
+                self._id_plant = plant.id
+            else:
+                p = re.compile("var idImpianto = (.*);")
+                result = p.search(page)
+                self._id_plant = result.group(1)
+            _LOGGER.info("idImpianto=%s", self._id_plant)
+
+            return True
+        return False
+
+    async def _ensure_logged_in(self) -> None:
+        if self._session is None:
+            login = await self.login()
+            if not login:
+                raise InvalidUsernameOrPasswordError
+
+    async def _get_history(self, key: tuple, url: str, closed: bool):
+        """Return a history response, from the cache when possible."""
+        loop = asyncio.get_running_loop()
+
+        if self._history_cache is not None:
+            # a response stored before its period closed still expires
+            payload = await loop.run_in_executor(
+                None, self._history_cache.get, key, HISTORY_CACHE_TTL
+            )
+            if payload is not None:
+                return json.loads(payload)
+
+        await self._ensure_logged_in()
+        response = await self._request(
+            "GET",
+            url,
+            priority=PRIORITY_BACKGROUND,
+            span_name=key[1],
+            timeout=60,
+            cookies=self._session,
+        )
+        if response.content is None:
+            raise AtonStorageConnectionError
+        data = json.loads(response.content)
+
+        if self._history_cache is not None:
+            await loop.run_in_executor(
+                None, self._history_cache.put, key, response.content, closed
+            )
+        return data
+
+    async def get_energy_history(self, day: date, today: date | None = None):
+        """Return the get_energy.php response of a day.
+
+        `today` is the current date in the plant's time zone, the host's
+        date when omitted. Only the days before it are cached for good.
+        """
+        today = today or date.today()
+        await self._ensure_logged_in()
+        return await self._get_history(
+            (self._id_plant, "get_energy", day.isoformat()),
+            _ENERGY_ENDPOINT.format(
+                id=self._id_plant, year=day.year, month=day.month, day=day.day
+            ),
+            closed=day < today,
+        )
+
+    async def get_battery_voltage_history(
+        self, year: int, month: int, today: date | None = None
+    ):
+        """Return the get_vbib.php response of a month.
+
+        `today` is the current date in the plant's time zone, the host's
+        date when omitted. Only the months before its month are cached
+        for good.
+        """
+        today = today or date.today()
+        return await self._get_history(
+            (self._serial_number, "get_vbib", f"{year:04d}-{month:02d}"),
+            _VBIB_ENDPOINT.format(
+                year=year, month=month, serial_number=self._serial_number
+            ),
+            closed=(year, month) < (today.year, today.month),
+        )
+
+    async def check_external_ev(self) -> bool | None:
+        """Ask hasExternalEV.php whether the plant has an EV charger."""
+        await self._ensure_logged_in()
+        response = await self._request(
+            "GET",
+            _HAS_EV_ENDPOINT.format(id=self._id_plant),
+            priority=PRIORITY_BACKGROUND,
+            timeout=60,
+            cookies=self._session,
+        )
+        if response.content is None:
+            raise AtonStorageConnectionError
+
+        text = response.content.decode("utf-8").strip()
+        if text == "Unauthorized":
+            self._session = None
+            raise AtonStorageConnectionError
+        try:
+            value = json.loads(text)
+        except ValueError as exc:
+            # an HTML login page or an error message, not an answer
+            self._session = None
+            raise AtonStorageConnectionError from exc
+
+        has_external_ev = _ev_answer(value)
+        if has_external_ev is None:
+            # keep the last known answer, None until one is understood
+            _LOGGER.warning("Unexpected hasExternalEV answer: %s", text[:200])
+            return self.has_external_ev
+        self.has_external_ev = has_external_ev
+        _LOGGER.info("External EV charger: %s", self.has_external_ev)
+        return self.has_external_ev
+
+    async def check_time_shift(self) -> str:
+        """Return the checkTShift.php response, which changes with the schedule."""
+        await self._ensure_logged_in()
+        response = await self._request(
+            "GET",
+            _CHECK_TSHIFT_ENDPOINT.format(serial_number=self._serial_number),
+            priority=PRIORITY_BACKGROUND,
+            timeout=60,
+            cookies=self._session,
+        )
+        if response.content is None:
+            raise AtonStorageConnectionError
+        return response.content.decode("utf-8").strip()
+
+    async def get_time_shift(self):
+        """Return the full getTShift.php schedule."""
+        await self._ensure_logged_in()
+        response = await self._request(
+            "GET",
+            _GET_TSHIFT_ENDPOINT.format(serial_number=self._serial_number),
+            priority=PRIORITY_BACKGROUND,
+            timeout=60,
+            cookies=self._session,
+        )
+        if response.content is None:
+            raise AtonStorageConnectionError
+        return json.loads(response.content)
+
+    async def refresh(self) -> None:
+        """Refresh data from server.
+
+        Concurrent callers share the refresh in progress, and callers within
+        `min_refresh_interval` of the last refresh get the current snapshot.
+        """
+        if self._serial_number is None:
+            raise SerialNumberRequiredError
+
+        window = self.min_refresh_interval
+        if self.live_interval:
+            window = min(window, self.live_interval)
+        if self._last_refresh is not None and monotonic() - self._last_refresh < window:
+            _LOGGER.debug("Data is fresh, skipping refresh")
+            return
+
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        await asyncio.shield(self._refresh_task)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_task = None
+        if not task.cancelled() and task.exception() is None:
+            self._last_refresh = monotonic()
+
+    async def _refresh(self) -> None:
+        await self._ensure_logged_in()
+
+        data = None
+        try:
+            set_interval = await self._request(
+                "GET",
+                _SET_REQUEST_ENDPOINT.format(
+                    serial_number=self._serial_number,
+                    interval=self.live_interval or self.interval | 15,
+                ),
+                span_name="set_request",
+                timeout=60,
+                cookies=self._session,
+            )
+            if set_interval.content is None:
+                _LOGGER.error("Unable to set refresh interval")
+                raise AtonStorageConnectionError
+            elif set_interval.content == "Unauthorized":
+                self._session = None
+                raise AtonStorageConnectionError
+
+            monitor = await self._request(
+                "GET",
+                _MONITOR_ENDPOINT.format(serial_number=self._serial_number),
+                span_name="get_monitor",
+                timeout=60,
+                cookies=self._session,
+            )
+            if monitor.content is None:
+                _LOGGER.error("Unable to start fetching data")
+                raise AtonStorageConnectionError
+            elif monitor.content == "Unauthorized":
+                self._session = None
+                raise AtonStorageConnectionError
+
+            json_dict = monitor.content
+            if json_dict is not None:
+                try:
+                    with span("parse_monitor"):
+                        data = json.loads(json_dict)
+                    _LOGGER.debug("Data fetched from resource: %s", json_dict)
+                    if self.has_external_ev is False:
+                        for key in EV_KEYS:
+                            data.pop(key, None)
+                except ValueError:
+                    _LOGGER.warning("REST result could not be parsed as JSON")
+                    _LOGGER.debug("Erroneous JSON: %s", self.data)
+                except Exception as exc:
+                    _LOGGER.error(exc)
+                    raise exc
+            else:
+                _LOGGER.warning("Empty reply found when expecting JSON data")
+
+            # hack fix
+            if data is not None and self._id_plant is not None:
+                energy = await self._request(
+                    "GET",
+                    _ENERGY_ENDPOINT.format(
+                        id=self._id_plant,
+                        year=datetime.now().year,
+                        month=datetime.now().month,
+                        day=datetime.now().day,
+                    ),
+                    span_name="get_energy",
+                    timeout=60,
+                    cookies=self._session,
+                )
+                if energy.content is None:
+                    _LOGGER.error("Unable to start fetching data")
+                    raise AtonStorageConnectionError
+                elif energy.content == "Unauthorized":
+                    self._session = None
+                    raise AtonStorageConnectionError
+                json_dict_energy = energy.content
+                if json_dict_energy is not None:
+                    try:
+                        with span("parse_energy"):
+                            energy_data = json.loads(json_dict_energy)
+                        _LOGGER.debug(
+                            "Data fetched from resource: %s", json_dict_energy
+                        )
+
+                        data["eVenduta"] = energy_data["tot_pReteOut"]
+
+                    except ValueError:
+                        _LOGGER.warning("REST result could not be parsed as JSON")
+                        _LOGGER.debug("Erroneous JSON: %s", self.data)
+                    except Exception as exc:
+                        _LOGGER.error(exc)
+                        raise exc
+                else:
+                    _LOGGER.warning("Empty reply found when expecting JSON data")
+
+            if data is not None:
+                with span("decode"):
+                    self.data = data
+                    self.derived = compute_derived(data)
+                    self._add_battery_sample(data)
+
+        except TypeError:
+            _LOGGER.error("Unable to fetch data. Response: %s", self.data)
+        except Exception as exc:
+            _LOGGER.error(exc)
+            raise exc
+
+    def get_raw_data(self, __name: str):
+        return self.data[__name]
+
+    @property
+    def grid_to_house(self) -> bool:
+        return int(self.data["status"]) & 1 == 1
+
+    @property
+    def solar_to_battery(self) -> bool:
+        return int(self.data["status"]) & 2 == 2
+
+    @property
+    def solar_to_grid(self) -> bool:
+        return int(self.data["status"]) & 4 == 4
+
+    @property
+    def battery_to_house(self) -> bool:
+        return int(self.data["status"]) & 8 == 8
+
+    @property
+    def solar_to_house(self) -> bool:
+        return int(self.data["status"]) & 16 == 16
+
+    @property
+    def grid_to_battery(self) -> bool:
+        return int(self.data["status"]) & 32 == 32
+
+    @property
+    def battery_to_grid(self) -> bool:
+        return int(self.data["status"]) & 64 == 64
+
+    @property
+    def serial_number(self) -> str:
+        return self.data["serialNumber"]
+
+    @property
+    def last_update(self) -> str:
+        return self.data["data"]
+
+    @property
+    def status(self) -> str:
+        return self.data["status"]
+
+    @property
+    def status_man(self) -> str:
+        return self.data["statusMan"]
+
+    @property
+    def instant_solar_power(self) -> int:
+        return int(self.data["pSolare"])
+
+    @property
+    def instant_user_power(self) -> int:
+        return int(self.data["pUtenze"])
+
+    @property
+    def instant_user_power_real(self) -> int:
+        return int(self.data["pUtenzeReal"])
+
+    @property
+    def instant_battery_power(self) -> int:
+        return int(self.data["pBatteria"])
+
+    @property
+    def instant_grid_input_power(self) -> int:
+        return int(self.data["pReteIn"])
+
+    @property
+    def instant_grid_output_power(self) -> int:
+        return int(self.data["pReteOut"])
+
+    @property
+    def instant_grid_power(self) -> int:
+        return int(self.data["pRete"])
+
+    @property
+    def instant_grid_power_real(self) -> int:
+        return int(self.data["pReteReal"])
+
+    @property
+    def status_of_charge(self) -> float:
+        return float(self.data["soc"])
+
+    @property
+    def run_mode(self) -> int:
+        return int(self.data["runMode"])
+
+    @property
+    def string1_current(self) -> float:
+        return float(self.data["string1I"])
+
+    @property
+    def string1_voltage(self) -> float:
+        return float(self.data["string1V"])
+
+    @property
+    def string2_current(self) -> float:
+        return float(self.data["string2I"])
+
+    @property
+    def string2_voltage(self) -> float:
+        return float(self.data["string2V"])
+
+    @property
+    def user_current(self) -> float:
+        return float(self.data["utenzeI"])
+
+    @property
+    def user_voltage(self) -> float:
+        return float(self.data["utenzeV"])
+
+    @property
+    def battery_voltage(self) -> float:
+        return float(self.data["vb"])
+
+    @property
+    def battery_current(self) -> float:
+        return float(self.data["ib"])
+
+    @property
+    def fw_Scheda(self) -> str:
+        return self.data["fwScheda"]
+
+    @property
+    def rel_inverter(self) -> str:
+        return self.data["relInverter"]
+
+    @property
+    def rel_manager(self) -> str:
+        return self.data["relManager"]
+
+    @property
+    def rel_charger(self) -> str:
+        return self.data["relCharger"]
+
+    @property
+    def rel_bios(self) -> str:
+        return self.data["relBIOS"]
+
+    @property
+    def charged(self) -> int:
+        return int(self.data["ahCaricati"])
+
+    @property
+    def discharge(self) -> int:
+        return int(self.data["ahScaricati"])
+
+    @property
+    def max_selled_power(self) -> int:
+        return self.data["pMaxVenduta"]
+
+    @property
+    def max_pannel_power(self) -> int:
+        return self.data["pMaxPannelli"]
+
+    @property
+    def max_battery_power(self) -> int:
+        return self.data["pMaxBatteria"]
+
+    @property
+    def max_bought_power(self) -> int:
+        return self.data["pMaxComprata"]
+
+    @property
+    def selled_energy(self) -> int:
+        return self.data["eVenduta"]
+
+    @property
+    def pannel_energy(self) -> int:
+        return self.data["ePannelli"]
+
+    @property
+    def self_consumed_energy(self) -> int:
+        return self.data["eBatteria"]
+
+    @property
+    def bought_energy(self) -> int:
+        return self.data["eComprata"]
+
+    @property
+    def consumed_energy(self) -> int:
+        return self.derived.consumed_energy
+
+    def _add_battery_sample(self, data: dict) -> None:
+        # timed by the portal, a snapshot the portal did not update is skipped
+        try:
+            timestamp = datetime.strptime(data["data"], "%d/%m/%Y %H:%M:%S")
+            self.battery.add(
+                timestamp.timestamp(), float(data["soc"]), float(data["pBatteria"])
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    @property
+    def _soc(self) -> float:
+        return min(100.0, float(self.data.get("soc") or 0))
+
+    @property
+    def battery_time_to_full(self) -> int | None:
+        """Return the minutes until the battery is full, while charging."""
+        minutes = self.battery.time_to_full(self._soc)
+        return round(minutes) if minutes is not None else None
+
+    @property
+    def battery_time_to_empty(self) -> int | None:
+        """Return the minutes until the battery is empty, while discharging."""
+        minutes = self.battery.time_to_empty(self._soc)
+        return round(minutes) if minutes is not None else None
+
+    @property
+    def battery_usable_capacity(self) -> float | None:
+        """Return the usable battery capacity in kWh fitted from the samples."""
+        capacity = self.battery.usable_capacity
+        return round(capacity, 1) if capacity is not None else None
+
+    # "ingressi1": "0",
+    # "ingressi2": "160",
+    # "ingressi3": "0",
+    # "ingressi4": "0",
+    # "ingressi5": "0",
+    # "ingressi6": "0",
+    # "ingressi7": "0",
+    # "ingressi8": "0",
+    # "uscite1": "0",
+    # "uscite2": "10",
+    # "uscite3": "0",
+    # "uscite4": "0",
+    # "uscite5": "0",
+    # "uscite6": "0",
+    # "iac1": "0",
+    # "iac2": "0",
+    # "iac3": "0",
+    # "allarmi1": "0",
+    # "allarmi2": "0",
+    # "allarmi3": "0",
+    # "allarmi4": "0",
+    # "allarmi5": "0",
+    # "allarmi6": "0",
+    # "allarmi7": "0",
+    # "allarmi8": "0",
+    # "allarmi9": "0",
+    # "allarmi10": "0",
+    # "allarmi11": "0",
+    # "allarmi12": "32",
+    # "allarmi13": "0",
+    # "allarmi14": "0",
+    # "allarmi15": "0",
+    # "allarmi16": "0",
+
+    @property
+    def grid_voltage(self) -> float:
+        return self.data["gridV"]
+
+    @property
+    def grid_frequency(self) -> float:
+        return self.data["gridHz"]
+
+    @property
+    def grid_power(self) -> float:
+        return self.data["pGrid"]
+
+    # "string1IIN": "0",
+    # "string1VIN": "0",
+    # "string2IIN": "0",
+    # "string2VIN": "0",
+
+    @property
+    def temperature(self) -> float:
+        return self.data["temperatura"]
+
+    @property
+    def temperature2(self) -> float:
+        return self.data["temperatura2"]
+
+    # "dataAllarme": "07/11/2022 07:11:28",
+
+    @property
+    def update_delay(self) -> int:
+        return self.data["DiffDate"]
+
+    # "DiffDate": "829",
+    # "timestampScheda": "07/11/2022 11:13:13",
+
+    @property
+    def vb_scheda(self) -> str:
+        return self.data["vbScheda"] | None
+
+    # "flagProgrammazione": "128",
+    # "flagProgrammazione3": "72",
+    # "wifi": "1",
+    # "exportLimit": "0",
+
+    # "pL1": "0",
+    # "pL2": "0",
+    # "pL3": "0",
+    # "pReteL1": "0",
+    # "pReteL2": "0",
+    # "pReteL3": "0",
+
+    @property
+    def ev_num(self) -> int:
+        return int(self.data["num_EV"])
+
+    @property
+    def ev_status_of_charge(self) -> float:
+        return float(self.data["SoC_EV"])
+
+    @property
+    def ev_status(self) -> int:
+        return int(self.data["stato_EV"])
+
+    # var firstNumber = (parseInt(_data.stato_EV)&0xf0)>>4;
+    # var secondNumber = parseInt(_data.stato_EV)&0x0f;
+
+    @property
+    def ev_status_off(self) -> bool:
+        if self.has_external_ev is False:
+            return False
+        return int(self.data["stato_EV"]) & 0xF0 >> 4 == 0 or (
+            int(self.data["stato_EV"]) & 0xF0 >> 4 == 1
+            and int(self.data["stato_EV"]) & 0x0F != 3
+        )
+
+    @property
+    def ev_status_on(self) -> bool:
+        if self.has_external_ev is False:
+            return False
+        return (
+            int(self.data["stato_EV"]) & 0xF0 >> 4 == 1
+            and int(self.data["stato_EV"]) & 0x0F == 3
+        )
+
+    @property
+    def ev_status_charge(self) -> bool:
+        if self.has_external_ev is False:
+            return False
+        return int(self.data["stato_EV"]) & 0xF0 >> 4 == 2
+
+    @property
+    def ev_status_warning(self) -> bool:
+        if self.has_external_ev is False:
+            return False
+        return (
+            int(self.data["stato_EV"]) & 0xF0 >> 4 == 4
+            or int(self.data["stato_EV"]) & 0xF0 >> 4 == 5
+        )
+
+    @property
+    def ev_setp(self) -> float:
+        return float(self.data["setp_EV"])  # in A
+
+    @property
+    def ev_power(self) -> int:
+        return int(self.data["potenza_EV"])  # carica in W
+
+    @property
+    def ev_kmh(self) -> float:
+        return float(self.data["kmh"])  # evCaricakmh km/h
+
+    @property
+    def ev_e_ciclo_(self) -> float:
+        return float(self.data["e_ciclo_EV"])  # evScaricakWh
+
+    @property
+    def ev_km(self) -> float:
+        return float(self.data["km"])  # evScaricakm km
+
+    @property
+    def ev_perc_carica(self) -> float:
+        return float(self.data["perc_carica"])  # evCaricakmh %
+
+    # "paese": "IT",
+    # "scena": "0",
+    # "qeps": "1",
+    # "allertaMeteoAuto": "0",
+
+    @property
+    def battery_count(self) -> int:
+        return self.data["numBatterie"]
+
+
+# keys of a JSON object answer that say whether there is a charger
+_EV_KEYS = ("hasexternalev", "has_external_ev", "externalev", "external_ev", "ev")
+
+
+def _ev_answer(value) -> bool | None:
+    """Whether a hasExternalEV.php answer says yes, None if it is not clear.
+
+    Only a bare scalar or an explicit EV key is trusted, the other values
+    of an object, such as the plant id, say nothing about the charger.
+    """
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if isinstance(value, dict):
+        values = {str(key).lower(): item for key, item in value.items()}
+        key = next((key for key in _EV_KEYS if key in values), None)
+        if key is None:
+            return None
+        value = values[key]
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("1", "true", "yes"):
+            return True
+        if value in ("0", "false", "no", ""):
+            return False
+    return None
+
+
+class AtonStorageConnectionError(Exception):
+    """Unable to start fetching data."""
+
+
+class UsernameAndPasswordRequiredError(Exception):
+    """Error username and password required."""
+
+
+class InvalidUsernameOrPasswordError(Exception):
+    """Error invalid username or password."""
+
+
+class SerialNumberRequiredError(Exception):
+    """Error to serial number required."""
@@ -0,0 +1,118 @@
+"""Quantities derived from an AtonStorage snapshot."""
+import math
+from dataclasses import dataclass
+
+
+def _float(data: dict, key: str) -> float:
+    # a malformed value only zeroes what depends on it, not the refresh
+    try:
+        value = float(data.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+
+def _int(data: dict, key: str) -> int:
+    return int(_float(data, key))
+
+
+@dataclass(frozen=True, slots=True)
+class DerivedMetrics:
+    """Computed once per snapshot, read by the entities."""
+
+    consumed_energy: int  # Wh
+    self_sufficiency: float  # %
+    self_consumption: float  # %
+    grid_power_in: int  # W
+    grid_power_out: int  # W
+    battery_power_in: int  # W
+    battery_power_out: int  # W
+    # energy flow matrix, W
+    solar_to_house: int = 0
+    solar_to_battery: int = 0
+    solar_to_grid: int = 0
+    battery_to_house: int = 0
+    battery_to_grid: int = 0
+    grid_to_house: int = 0
+    grid_to_battery: int = 0
+
+
+# (flow, source, sink, status bit) in allocation order, the sources and the
+# sinks are served in the order the plant itself serves them
+FLOWS = (
+    ("solar_to_house", "solar", "house", 16),
+    ("battery_to_house", "battery", "house", 8),
+    ("grid_to_house", "grid", "house", 1),
+    ("solar_to_battery", "solar", "battery", 2),
+    ("grid_to_battery", "grid", "battery", 32),
+    ("solar_to_grid", "solar", "grid", 4),
+    ("battery_to_grid", "battery", "grid", 64),
+)
+
+
+def allocate_flows(
+    solar: int, house: int, battery: int, grid: int, status: int
+) -> dict[str, int]:
+    """Split the measured powers into the power of every flow.
+
+    `battery` is positive while charging and `grid` positive while
+    exporting. The flows flagged in the `status` bits are served first,
+    then whatever power is left is spread over the other flows so that
+    the flows always add up to the measurements.
+    """
+    sources = {
+        "solar": max(solar, 0),
+        "battery": max(-battery, 0),
+        "grid": max(-grid, 0),
+    }
+    sinks = {
+        "house": max(house, 0),
+        "battery": max(battery, 0),
+        "grid": max(grid, 0),
+    }
+    flows = dict.fromkeys((flow for flow, *_ in FLOWS), 0)
+
+    for flagged_only in (True, False) if status else (False,):
+        for flow, source, sink, bit in FLOWS:
+            if flagged_only and not status & bit:
+                continue
+            power = min(sources[source], sinks[sink])
+            if power > 0:
+                flows[flow] += power
+                sources[source] -= power
+                sinks[sink] -= power
+
+    return flows
+
+
+def compute_derived(data: dict) -> DerivedMetrics:
+    """Compute the derived metrics of a monitor snapshot."""
+    bought = _int(data, "eComprata")
+    consumed = bought + _int(data, "eBatteria")
+    panel = _int(data, "ePannelli")
+    # eVenduta comes from get_energy.php in kWh, the other energies are in Wh
+    sold = _float(data, "eVenduta") * 1000
+    grid = _int(data, "pRete")
+    battery = _int(data, "pBatteria")
+    flows = allocate_flows(
+        _int(data, "pSolare"),
+        _int(data, "pUtenze"),
+        battery,
+        grid,
+        _int(data, "status"),
+    )
+
+    return DerivedMetrics(
+        consumed_energy=consumed,
+        self_sufficiency=100
+        if consumed == 0
+        else round(100 - ((bought / consumed) * 100), 2),
+        self_consumption=100
+        if panel == 0
+        else round(max(0, 100 - ((sold / panel) * 100)), 2),
+        grid_power_in=abs(grid) if grid < 0 else 0,
+        grid_power_out=grid if grid > 0 else 0,
+        battery_power_in=battery if battery > 0 else 0,
+        battery_power_out=abs(battery) if battery < 0 else 0,
+        **flows,
+    )
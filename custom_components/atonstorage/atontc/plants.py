@@ -0,0 +1,94 @@
+"""Plants visible to an AtonTC account, read from the portal page."""
+import html
+import re
+from dataclasses import dataclass
+
+_ID_KEYS = ("idimpianto", "id_impianto", "data-idimpianto", "data-id", "value")
+_SERIAL_KEYS = (
+    "sn",
+    "serialnumber",
+    "numeroserie",
+    "seriale",
+    "data-sn",
+    "data-serial",
+)
+_NAME_KEYS = ("nomeimpianto", "nome", "name", "descrizione")
+# script variables naming the plant of the page, other keys are too generic
+_VAR_KEYS = ("idimpianto", "sn", "serialnumber", "numeroserie", "nomeimpianto")
+
+_VAR = re.compile(r"""var\s+(\w+)\s*=\s*(["']?)([^"';\r\n]*)\2\s*;""")
+# a flat object literal, which is how the portal embeds lists in scripts
+_OBJECT = re.compile(r"\{[^{}]*\}")
+_OBJECT_PAIR = re.compile(
+    r"""["']?(\w+)["']?\s*:\s*(?:"([^"]*)"|'([^']*)'|([\w.-]+))"""
+)
+_OPTION = re.compile(r"<option\b([^>]*)>([^<]*)", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+@dataclass(frozen=True)
+class Plant:
+    """A plant of the account."""
+
+    id: str
+    serial_number: str
+    name: str | None = None
+
+
+def _pick(values: dict[str, str], keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        value = values.get(key)
+        if value and value.lower() not in ("null", "undefined"):
+            return html.unescape(value).strip()
+    return None
+
+
+def _pairs(pattern: re.Pattern, text: str) -> dict[str, str]:
+    return {
+        match.group(1).lower(): next(
+            (group for group in match.groups()[1:] if group is not None), ""
+        )
+        for match in pattern.finditer(text)
+    }
+
+
+def _plant(values: dict[str, str], name: str | None = None) -> Plant | None:
+    plant_id = _pick(values, _ID_KEYS)
+    serial_number = _pick(values, _SERIAL_KEYS)
+    if plant_id is None or serial_number is None:
+        return None
+    return Plant(plant_id, serial_number, _pick(values, _NAME_KEYS) or name)
+
+
+def parse_plants(page: str) -> list[Plant]:
+    """Return every plant with its id and serial number found in a portal page.
+
+    The page of a single plant declares it in script variables
+    (`var idImpianto = ...;` and the serial number), accounts with several
+    plants also list them in object literals or in the options of a plant
+    picker. Plants are returned once per serial number, in page order.
+    """
+    candidates = []
+
+    variables = {
+        match.group(1).lower(): match.group(3) for match in _VAR.finditer(page)
+    }
+    candidates.append(
+        _plant({key: variables[key] for key in _VAR_KEYS if key in variables})
+    )
+
+    for match in _OBJECT.finditer(page):
+        candidates.append(_plant(_pairs(_OBJECT_PAIR, match.group(0))))
+
+    for match in _OPTION.finditer(page):
+        label = html.unescape(match.group(2)).strip() or None
+        candidates.append(_plant(_pairs(_ATTRIBUTE, match.group(1)), label))
+
+    plants = {}
+    for plant in candidates:
+        if plant is None:
+            continue
+        known = plants.get(plant.serial_number)
+        if known is None or (known.name is None and plant.name is not None):
+            plants[plant.serial_number] = plant
+    return list(plants.values())
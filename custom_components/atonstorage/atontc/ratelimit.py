@@ -0,0 +1,134 @@
+"""Token bucket rate limiter shared by the requests of an AtonTC account."""
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from time import monotonic
+
+PRIORITY_LIVE = 0
+PRIORITY_BACKGROUND = 10
+
+
+class RateLimiter:
+    """Limit the request rate and the concurrent requests to a host.
+
+    `rate` tokens are added every second up to `burst`, every request takes
+    one token and one of the `max_concurrency` slots. Waiting requests are
+    served by priority, lower first, then in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int) -> None:
+        """Initialize."""
+        self._rate = rate
+        self._burst = burst
+        self._max_concurrency = max_concurrency
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+        self._requests = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    def configure(self, rate: float, burst: int, max_concurrency: int) -> None:
+        """Change the limits, waiting requests are re-evaluated."""
+        self._refill()
+        self._rate = rate
+        self._burst = burst
+        self._max_concurrency = max_concurrency
+        self._tokens = min(self._tokens, burst)
+        self._dispatch()
+
+    @property
+    def stats(self) -> dict:
+        """Return the queue wait metrics."""
+        return {
+            "requests": self._requests,
+            "delayed": self._delayed,
+            "queued": sum(1 for *_, waiter in self._waiters if not waiter.done()),
+            "active": self._active,
+            "wait_last_ms": round(self._last_wait * 1000, 1),
+            "wait_avg_ms": round(
+                self._total_wait / self._requests * 1000 if self._requests else 0, 1
+            ),
+            "wait_max_ms": round(self._max_wait * 1000, 1),
+        }
+
+    @asynccontextmanager
+    async def acquire(self, priority: int = PRIORITY_LIVE):
+        """Wait for a token and a free slot."""
+        started = monotonic()
+        await self._acquire(priority)
+        wait = monotonic() - started
+
+        self._requests += 1
+        self._total_wait += wait
+        self._last_wait = wait
+        self._max_wait = max(self._max_wait, wait)
+        if wait > 0.001:
+            self._delayed += 1
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _can_start(self) -> bool:
+        return self._active < self._max_concurrency and self._tokens >= 1
+
+    def _start(self) -> None:
+        self._tokens -= 1
+        self._active += 1
+
+    async def _acquire(self, priority: int) -> None:
+        self._refill()
+        if not self._waiters and self._can_start():
+            self._start()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was granted while the caller was being cancelled
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._refill()
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_start():
+                break
+            self._start()
+            heapq.heappop(self._waiters)[2].set_result(None)
+
+        if self._waiters and self._active < self._max_concurrency:
+            # waiting for a token, wake up when the next one is available
+            delay = (1 - self._tokens) / self._rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
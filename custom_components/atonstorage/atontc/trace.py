@@ -0,0 +1,130 @@
+"""Structured trace spans of the refresh cycles.
+
+A cycle is opened with `Tracer.cycle()`, every `span()` entered in the same
+task, or in a task created from it, is then written as one compact JSON
+line carrying the cycle id:
+
+    {"cycle":"3f0c9a6e1b2d4c58","serial":"T1","span":"get_monitor","start":1700000000.123,"ms":412.7,"status":200,"bytes":2140}
+
+Outside of a cycle `span()` costs a context variable lookup.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_CURRENT: ContextVar["_Trace | None"] = ContextVar("atontc_trace", default=None)
+
+
+class _NoSpan:
+    """Context manager standing for a span outside of a cycle."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> dict:
+        return {}
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Trace:
+    __slots__ = ("cycle", "serial_number", "_write")
+
+    def __init__(self, serial_number: str, write: Callable[[str], None]) -> None:
+        self.cycle = uuid.uuid4().hex[:16]
+        self.serial_number = serial_number
+        self._write = write
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as exc:
+            attributes["error"] = type(exc).__name__
+            raise
+        finally:
+            record = {
+                "cycle": self.cycle,
+                "serial": self.serial_number,
+                "span": name,
+                "start": round(start, 3),
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                **attributes,
+            }
+            self._write(json.dumps(record, separators=(",", ":"), default=str))
+
+
+def span(name: str, **attributes):
+    """Time a part of the current cycle, a no-op outside of a cycle.
+
+    The context manager returns the attribute dict of the span, to which
+    the caller can add values known only at the end.
+    """
+    trace = _CURRENT.get()
+    if trace is None:
+        return _NO_SPAN
+    return trace.span(name, **attributes)
+
+
+class Tracer:
+    """Open the traced cycles of a plant and hand their lines to a sink."""
+
+    def __init__(self, serial_number: str, write: Callable[[str], None]) -> None:
+        """Initialize."""
+        self.serial_number = serial_number
+        self.write = write
+
+    @contextmanager
+    def cycle(self):
+        """Trace a refresh cycle, the whole cycle being a span itself."""
+        trace = _Trace(self.serial_number, self.write)
+        token = _CURRENT.set(trace)
+        try:
+            with trace.span("cycle"):
+                yield trace
+        finally:
+            _CURRENT.reset(token)
+
+
+def logger_sink(logger: logging.Logger | None = None) -> Callable[[str], None]:
+    """Return a sink writing the lines to a logger at the INFO level."""
+    logger = logger or logging.getLogger(__name__)
+    return logger.info
+
+
+class RotatingFileSink:
+    """Write the lines to a rotating file from a background thread.
+
+    Creating the sink creates the folder, call it from an executor.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int = 3) -> None:
+        """Initialize."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, self._handler)
+        self._listener.start()
+
+    def __call__(self, line: str) -> None:
+        self._queue.put_nowait(logging.makeLogRecord({"msg": line}))
+
+    def close(self) -> None:
+        """Flush the pending lines and close the file, blocking."""
+        self._listener.stop()
+        self._handler.close()
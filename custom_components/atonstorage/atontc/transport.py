@@ -0,0 +1,46 @@
+"""Dedicated HTTP transport for the AtonTC portal."""
+import logging
+
+import httpx
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 2
+DEFAULT_KEEPALIVE_EXPIRY = 120  # seconds
+DEFAULT_TIMEOUT = 60  # seconds
+
+
+def create_async_client(
+    http2: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    verify=False,
+) -> httpx.AsyncClient:
+    """Return an httpx client tuned for one AtonTC account.
+
+    Connections are kept alive between two polls and responses are
+    requested gzip compressed. HTTP/2 needs the optional `h2` package and
+    falls back to HTTP/1.1 when it is missing.
+
+    Building the client creates an SSL context, call it from an executor.
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            _LOGGER.warning("HTTP/2 requested but the h2 package is missing")
+            http2 = False
+
+    return httpx.AsyncClient(
+        verify=verify,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        headers={"Accept-Encoding": "gzip"},
+        timeout=DEFAULT_TIMEOUT,
+    )
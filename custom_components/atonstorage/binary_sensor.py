@@ -9,7 +9,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -25,6 +25,7 @@ class AtonStorageBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Class to describe a AtonStorage sensor entity."""
 
     value_calc_function: Callable[[AtonStorage], Any] = None
+    ev: bool = False
 
 
 INVERTER_BINARY_SENSOR_DESCRIPTIONS = (
@@ -82,6 +83,7 @@ INVERTER_BINARY_SENSOR_DESCRIPTIONS = (
         key="ev_status_off",
         translation_key="ev_status_off",
         name="EV OFF",
+        ev=True,
         entity_category=EntityCategory.DIAGNOSTIC,
         value_calc_function=lambda controller: controller.ev_status_off,
     ),
@@ -89,6 +91,7 @@ INVERTER_BINARY_SENSOR_DESCRIPTIONS = (
         key="ev_status_on",
         translation_key="ev_status_on",
         name="EV ON",
+        ev=True,
         entity_category=EntityCategory.DIAGNOSTIC,
         value_calc_function=lambda controller: controller.ev_status_on,
     ),
@@ -96,6 +99,7 @@ INVERTER_BINARY_SENSOR_DESCRIPTIONS = (
         key="ev_status_charge",
         translation_key="ev_status_charge",
         name="EV Charging",
+        ev=True,
         entity_category=EntityCategory.DIAGNOSTIC,
         value_calc_function=lambda controller: controller.ev_status_charge,
     ),
@@ -103,6 +107,7 @@ INVERTER_BINARY_SENSOR_DESCRIPTIONS = (
         key="ev_status_warning",
         translation_key="ev_status_warning",
         name="EV Warning",
+        ev=True,
         entity_category=EntityCategory.DIAGNOSTIC,
         value_calc_function=lambda controller: controller.ev_status_warning,
     ),
@@ -116,27 +121,37 @@ async def async_setup_entry(
 ) -> None:
     """Set up the AtonStorage sensors."""
     _LOGGER.debug("Set up the AtonStorage binary sensors")
-    entities = _create_entities(hass, entry)
-    async_add_entities(entities, True)
+    entry_data = hass.data[DOMAIN][entry.entry_id]
 
+    @callback
+    def _async_add_selected(sensors_selected) -> None:
+        entities = _create_entities(hass, entry, sensors_selected)
+        entry_data["entities"].extend(entities)
+        async_add_entities(entities, True)
 
-def _create_entities(hass: HomeAssistant, entry: dict):
+    # called again by the options listener with the newly selected sensors
+    entry_data["entity_adders"].append(_async_add_selected)
+    _async_add_selected(entry_data["sensors_selected"])
+
+
+def _create_entities(hass: HomeAssistant, entry: ConfigEntry, sensors_selected):
     entities = []
 
     controller = hass.data[DOMAIN][entry.entry_id]["controller"]
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    username = hass.data[DOMAIN][entry.entry_id]["username"]
-    sensors_selected = hass.data[DOMAIN][entry.entry_id]["sensors_selected"]
+    device_info = hass.data[DOMAIN][entry.entry_id]["device_info"]
 
     if "BINARY SENSORS" in sensors_selected:
         for entity_description in INVERTER_BINARY_SENSOR_DESCRIPTIONS:
+            if entity_description.ev and controller.has_external_ev is False:
+                continue
             entities.append(
                 AtonStorageBinarySensorEntity(
                     entry=entry,
                     controller=controller,
                     coordinator=coordinator,
                     description=entity_description,
-                    username=username,
+                    device_info=device_info,
                 )
             )
 
@@ -149,43 +164,38 @@ class AtonStorageBinarySensorEntity(CoordinatorEntity, BinarySensorEntity):
     entity_description: AtonStorageBinarySensorEntityDescription
     # _attr_has_entity_name = True
 
+    # the binary sensors are selected all together
+    selection_name = "BINARY SENSORS"
+
     def __init__(
         self,
         entry: ConfigEntry,
         controller: AtonStorage,
         coordinator,
         description: AtonStorageBinarySensorEntityDescription,
-        username,
-        # device_info,
+        device_info: DeviceInfo,
     ):
         """Batched AtonStorage Sensor Entity constructor."""
         super().__init__(coordinator)
 
-        self.controller = controller
         self.entity_description = description
 
         # self._entry = entry
         # self._name = self.entity_description.name
         # self._attr_name = f"{controller.serial_number}_{self.entity_description.name}"
         # self._attr_translation_key = self.entity_description.key
-        self._attr_name = f"{username} {self.entity_description.name}"
+        self._attr_name = f"{controller.serial_number} {self.entity_description.name}"
         self._attr_unique_id = (
             f"{controller.serial_number}_{self.entity_description.key}"
         )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "AtonStorage " + username)},
-            name=username,
-            manufacturer="AtonStorage",
-            sw_version=controller.fw_Scheda,
-            serial_number=controller.serial_number,
-        )
+        self._attr_device_info = device_info
 
-        self._register_key = self.entity_description.key
-        if "#" in self._register_key:
-            self._register_key = self._register_key[0 : self._register_key.find("#")]
+    @property
+    def controller(self) -> AtonStorage:
+        return self.coordinator.bridge
 
     @property
     def is_on(self):
         """Return true if the binary sensor is on."""
 
-        return self.entity_description.value_calc_function(self.controller)
+        return self.entity_description.value_calc_function(self.coordinator.bridge)
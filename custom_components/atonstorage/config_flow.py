@@ -12,10 +12,38 @@ from homeassistant.const import (
     CONF_USERNAME,
 )
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util import slugify
 
-from .const import AVAILABLE_SENSORS, DEFAULT_NAME, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .const import (
+    AVAILABLE_SENSORS,
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_MAX_SIZE,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HTTP2,
+    CONF_MAX_CONCURRENCY,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_RATE_LIMIT,
+    CONF_RELATIVE_DEADBAND,
+    CONF_TRACE,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_EXPORT_MAX_SIZE,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HTTP2,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RELATIVE_DEADBAND,
+    DEFAULT_TRACE,
+    DEFAULT_NAME,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    EXPORT_FORMATS,
+    TRACE_MODES,
+)
+from .atontc.plants import Plant
+from .atontc.transport import create_async_client
 from .controller import AtonStorageConnectionError
 from .controller import Controller as AtonStorage
 from .controller import SerialNumberRequiredError, UsernameAndPasswordRequiredError
@@ -26,7 +54,7 @@ DEVICE_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
-        vol.Required(CONF_DEVICE_ID): str,
+        vol.Optional(CONF_DEVICE_ID): str,
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
         vol.Required(
             CONF_MONITORED_VARIABLES, default=AVAILABLE_SENSORS
@@ -48,24 +76,36 @@ class FlowHandler(ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    def __init__(self) -> None:
+        """Initialize."""
+        self._user_input: dict | None = None
+        self._plants: list[Plant] = []
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors = {}
 
         if user_input is not None:
+            async_client = await self.hass.async_add_executor_job(create_async_client)
             try:
-
                 user = user_input.get(CONF_USERNAME, None)
                 password = user_input.get(CONF_PASSWORD, None)
-                serial_number = user_input.get(CONF_DEVICE_ID, None)
+                serial_number = user_input.get(CONF_DEVICE_ID) or None
                 name = f"{DEFAULT_NAME} {user}"
                 interval = user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
                 opts = {
-                    "session": async_get_clientsession(self.hass),
                     "interval": interval,
+                    "async_client": async_client,
                 }
                 controller = AtonStorage(self.hass, user, password, serial_number, opts)
+                if serial_number is None:
+                    # the login page lists the plants of the account
+                    if not await controller.login():
+                        raise AtonStorageConnectionError
+                    return await self._async_step_discovered(
+                        user_input, controller.plants
+                    )
                 await controller.refresh()
 
                 await self.async_set_unique_id(slugify(controller.serial_number))
@@ -87,14 +127,92 @@ class FlowHandler(ConfigFlow, domain=DOMAIN):
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
+            finally:
+                await async_client.aclose()
 
         return self.async_show_form(
             step_id="user", data_schema=DEVICE_SCHEMA, errors=errors
         )
 
-    # async def async_step_import(self, user_input):
-    #    """Handle import."""
-    #    return await self.async_step_user(user_input)
+    async def _async_step_discovered(self, user_input, plants: list[Plant]):
+        """Let the user pick the plants found at login."""
+        configured = self._async_current_ids()
+        self._plants = [
+            plant for plant in plants if slugify(plant.serial_number) not in configured
+        ]
+        if not self._plants:
+            if plants:
+                return self.async_abort(reason="already_configured")
+            return self.async_show_form(
+                step_id="user",
+                data_schema=DEVICE_SCHEMA,
+                errors={CONF_DEVICE_ID: "no_plants_found"},
+            )
+
+        # the plants are parsed from the page markup, the user confirms them
+        # even when there is a single one
+        self._user_input = user_input
+        return await self.async_step_plant()
+
+    async def async_step_plant(self, user_input=None):
+        """Pick the plants of the account to set up."""
+        errors = {}
+
+        if user_input is not None and not user_input[CONF_DEVICE_ID]:
+            errors["base"] = "no_plant_selected"
+        elif user_input is not None:
+            first, *others = user_input[CONF_DEVICE_ID]
+            for serial_number in others:
+                # a flow creates a single entry, the others get their own flow
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data={**self._user_input, CONF_DEVICE_ID: serial_number},
+                    )
+                )
+            return await self.async_step_import(
+                {**self._user_input, CONF_DEVICE_ID: first}
+            )
+
+        return self.async_show_form(
+            step_id="plant",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DEVICE_ID,
+                        default=[plant.serial_number for plant in self._plants],
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(
+                                    value=plant.serial_number,
+                                    label=(
+                                        f"{plant.name} ({plant.serial_number})"
+                                        if plant.name
+                                        else plant.serial_number
+                                    ),
+                                )
+                                for plant in self._plants
+                            ],
+                            multiple=True,
+                            mode=selector.SelectSelectorMode.LIST,
+                        ),
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_import(self, user_input):
+        """Create the entry of a plant found at login."""
+        serial_number = user_input[CONF_DEVICE_ID]
+        await self.async_set_unique_id(slugify(serial_number))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=f"{DEFAULT_NAME} {user_input[CONF_USERNAME]} {serial_number}",
+            data=user_input,
+        )
 
     @staticmethod
     def async_get_options_flow(config_entry: ConfigEntry):
@@ -122,6 +240,34 @@ class OptionsFlowHandler(OptionsFlow):
         interval = self.config_entry.options.get(
             CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
         )
+        rate_limit = self.config_entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+        max_concurrency = self.config_entry.options.get(
+            CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+        )
+        export_format = self.config_entry.options.get(
+            CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT
+        )
+        export_max_size = self.config_entry.options.get(
+            CONF_EXPORT_MAX_SIZE, DEFAULT_EXPORT_MAX_SIZE
+        )
+        http2 = self.config_entry.options.get(CONF_HTTP2, DEFAULT_HTTP2)
+        power_deadband = self.config_entry.options.get(
+            CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND
+        )
+        relative_deadband = self.config_entry.options.get(
+            CONF_RELATIVE_DEADBAND, DEFAULT_RELATIVE_DEADBAND
+        )
+        min_write_interval = self.config_entry.options.get(
+            CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL
+        )
+        heartbeat_interval = self.config_entry.options.get(
+            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+        )
+        trace = self.config_entry.options.get(CONF_TRACE, DEFAULT_TRACE)
+        sensors_selected = self.config_entry.options.get(
+            CONF_MONITORED_VARIABLES,
+            self.config_entry.data.get(CONF_MONITORED_VARIABLES, AVAILABLE_SENSORS),
+        )
 
         return self.async_show_form(
             step_id="init",
@@ -130,6 +276,51 @@ class OptionsFlowHandler(OptionsFlow):
                     # vol.Required(CONF_DEVICE_ID, default=serial_number): str,
                     # vol.Optional(CONF_NAME, default=name): str,
                     vol.Optional(CONF_SCAN_INTERVAL, default=interval): int,
+                    vol.Required(
+                        CONF_MONITORED_VARIABLES, default=sensors_selected
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=AVAILABLE_SENSORS,
+                            multiple=True,
+                            mode=selector.SelectSelectorMode.LIST,
+                        ),
+                    ),
+                    vol.Optional(CONF_RATE_LIMIT, default=rate_limit): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
+                    vol.Optional(
+                        CONF_MAX_CONCURRENCY, default=max_concurrency
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_EXPORT_FORMAT, default=export_format
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=EXPORT_FORMATS,
+                            translation_key=CONF_EXPORT_FORMAT,
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_EXPORT_MAX_SIZE, default=export_max_size
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(CONF_HTTP2, default=http2): bool,
+                    vol.Optional(CONF_POWER_DEADBAND, default=power_deadband): vol.All(
+                        vol.Coerce(float), vol.Range(min=0)
+                    ),
+                    vol.Optional(
+                        CONF_RELATIVE_DEADBAND, default=relative_deadband
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_MIN_WRITE_INTERVAL, default=min_write_interval
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_HEARTBEAT_INTERVAL, default=heartbeat_interval
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(CONF_TRACE, default=trace): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=TRACE_MODES,
+                            translation_key=CONF_TRACE,
+                        ),
+                    ),
                 }
             ),
         )
@@ -6,9 +6,106 @@ DEFAULT_NAME = "AtonStorage"
 
 DEFAULT_SCAN_INTERVAL = 30
 
+DEFAULT_LIVE_INTERVAL = 5
+DEFAULT_LIVE_DURATION = 300
+MAX_LIVE_DURATION = 3600
+
+DEFAULT_CASSETTE_CYCLES = 10
+DEFAULT_PROFILE_CYCLES = 5
+
+# not in homeassistant.const before 2024
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CYCLES = "cycles"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_END = "end"
+ATTR_PERIOD = "period"
+ATTR_RANK = "rank"
+ATTR_START = "start"
+
+DEFAULT_KPI_RANK = 5
+
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_RATE_LIMIT = "rate_limit"
+
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_RATE_LIMIT = 30  # requests per minute
+RATE_LIMIT_BURST = 5
+
+# hass.data key of the rate limiters shared by the entries of an account
+DATA_RATE_LIMITERS = DOMAIN + "_rate_limiters"
+
+# hass.data key of the HTTP transports shared by the entries of an account
+DATA_TRANSPORTS = DOMAIN + "_transports"
+CONF_HTTP2 = "http2"
+DEFAULT_HTTP2 = False
+
+# hass.data key of the scheduler spreading the polls of the entries
+DATA_POLL_SCHEDULER = DOMAIN + "_poll_scheduler"
+
+# hass.data key of the history response cache
+DATA_HISTORY_CACHE = DOMAIN + "_history_cache"
+HISTORY_CACHE_MAX_SIZE = 50  # MB
+
+# completed months of battery voltage history imported as statistics
+HISTORY_BACKFILL_MONTHS = 12
+
+TIME_SHIFT_CHECK_INTERVAL = 900  # seconds
+EV_CHECK_INTERVAL = 86400  # seconds
+
+# write throttling of the measurement sensors, see throttle.py
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_RELATIVE_DEADBAND = "relative_deadband"
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+
+DEFAULT_POWER_DEADBAND = 10  # W
+DEFAULT_RELATIVE_DEADBAND = 0  # percent
+DEFAULT_MIN_WRITE_INTERVAL = 0  # seconds
+DEFAULT_HEARTBEAT_INTERVAL = 300  # seconds
+
+CONF_EXPORT_FORMAT = "export_format"
+CONF_EXPORT_MAX_SIZE = "export_max_size"
+
+EXPORT_FORMAT_NONE = "none"
+EXPORT_FORMAT_LINE_PROTOCOL = "line_protocol"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMATS = [EXPORT_FORMAT_NONE, EXPORT_FORMAT_LINE_PROTOCOL, EXPORT_FORMAT_CSV]
+
+DEFAULT_EXPORT_FORMAT = EXPORT_FORMAT_NONE
+DEFAULT_EXPORT_MAX_SIZE = 10  # MB
+EXPORT_FLUSH_INTERVAL = 60  # seconds
+EXPORT_MAX_BATCH = 500
+
+CONF_TRACE = "trace"
+
+TRACE_OFF = "off"
+TRACE_LOGGER = "logger"
+TRACE_FILE = "file"
+TRACE_MODES = [TRACE_OFF, TRACE_LOGGER, TRACE_FILE]
+
+DEFAULT_TRACE = TRACE_OFF
+TRACE_MAX_SIZE = 5  # MB
+
+SERVICE_ENERGY_KPIS = "energy_kpis"
+SERVICE_PROFILE = "profile"
+SERVICE_RECORD_CASSETTE = "record_cassette"
+SERVICE_START_LIVE_MODE = "start_live_mode"
+SERVICE_STOP_LIVE_MODE = "stop_live_mode"
+
+# Dispatcher signal carrying every decoded snapshot, formatted with the serial number
+SIGNAL_SNAPSHOT = DOMAIN + "_snapshot_{}"
+# last snapshots kept in memory for the websocket replay
+SNAPSHOT_RING_SIZE = 120
+
 AVAILABLE_SENSORS = [
     "Last update",
+    "Update delay",
+    "Status",
+    "Status man",
+    "Run mode",
     "Self sufficiency",
+    "Self consumption",
     "Instant solar power",
     "Instant user power",
     "Instant battery power",
@@ -17,11 +114,28 @@ AVAILABLE_SENSORS = [
     "Instant grid power",
     "Instant grid power input",
     "Instant grid power output",
+    "Solar to house power",
+    "Solar to battery power",
+    "Solar to grid power",
+    "Battery to house power",
+    "Battery to grid power",
+    "Grid to house power",
+    "Grid to battery power",
+    "Solar to house energy",
+    "Solar to battery energy",
+    "Solar to grid energy",
+    "Battery to house energy",
+    "Battery to grid energy",
+    "Grid to house energy",
+    "Grid to battery energy",
     "Battery level",
     "Battery voltage",
     "Battery current",
     "Battery charged current",
     "Battery discharged current",
+    "Battery time to full",
+    "Battery time to empty",
+    "Battery usable capacity",
     "Battery charged energy",
     "Battery discharged energy",
     "Daily bought energy",
@@ -47,5 +161,9 @@ AVAILABLE_SENSORS = [
     "EV Charged",
     "EV km",
     "EV charged percentage",
+    "Request queue wait",
+    "Poll offset",
+    "Time shift active slot",
+    "Time shift next slot",
     "BINARY SENSORS",
 ]
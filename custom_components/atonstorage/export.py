@@ -0,0 +1,218 @@
+"""Local time-series export of AtonStorage snapshots."""
+import asyncio
+import csv
+import io
+import logging
+import os
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    EXPORT_FLUSH_INTERVAL,
+    EXPORT_FORMAT_CSV,
+    EXPORT_MAX_BATCH,
+    SIGNAL_SNAPSHOT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_EXTENSIONS = {EXPORT_FORMAT_CSV: "csv"}
+
+
+def _numeric_fields(data: dict) -> dict[str, float]:
+    """Return the snapshot values that can be exported as numbers."""
+    fields = {}
+    for key, value in data.items():
+        try:
+            fields[key] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return fields
+
+
+def _snapshot_time(data: dict) -> datetime:
+    """Return when the portal took a snapshot, the current time if unknown."""
+    try:
+        taken = datetime.strptime(data["data"], "%d/%m/%Y %H:%M:%S")
+    except (KeyError, TypeError, ValueError):
+        return dt_util.utcnow()
+    return dt_util.as_utc(taken.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(" ", "\\ ")
+
+
+class ExportSink:
+    """Append decoded snapshots to local line-protocol or CSV files.
+
+    Snapshots are buffered in memory and written in batches from the
+    executor. Rows carry the time the portal took the snapshot. Files are
+    rotated every day and whenever they grow past `max_bytes`, and CSV
+    files also whenever a snapshot brings new columns.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        serial_number: str,
+        export_format: str,
+        directory: str,
+        max_bytes: int,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._serial_number = serial_number
+        self._format = export_format
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._extension = _EXTENSIONS.get(export_format, "lp")
+        self._buffer: list[tuple[datetime, dict]] = []
+        self._columns: list[str] | None = None
+        self._csv_day: str | None = None
+        self._csv_path: str | None = None
+        self._lock = asyncio.Lock()
+        self._unsubs = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start collecting snapshots."""
+        self._unsubs.append(
+            async_dispatcher_connect(
+                self._hass,
+                SIGNAL_SNAPSHOT.format(self._serial_number),
+                self._async_add,
+            )
+        )
+        self._unsubs.append(
+            async_track_time_interval(
+                self._hass,
+                self.async_flush,
+                timedelta(seconds=EXPORT_FLUSH_INTERVAL),
+            )
+        )
+
+    async def async_stop(self) -> None:
+        """Stop collecting snapshots and write what is left in the buffer."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        await self.async_flush()
+
+    @callback
+    def _async_add(self, data: dict) -> None:
+        self._buffer.append((_snapshot_time(data), dict(data)))
+        if len(self._buffer) >= EXPORT_MAX_BATCH:
+            self._hass.async_create_task(self.async_flush())
+
+    async def async_flush(self, _now=None) -> None:
+        """Write the buffered snapshots."""
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            try:
+                await self._hass.async_add_executor_job(self._write, batch)
+            except OSError as exc:
+                _LOGGER.error("Unable to export AtonStorage data: %s", exc)
+
+    def _path(self, day: str, new_file: bool = False) -> str:
+        """Return the file to append to, rotating on size or on request."""
+        index = 0
+        while True:
+            suffix = f".{index}" if index else ""
+            path = os.path.join(
+                self._directory,
+                f"{self._serial_number}-{day}{suffix}.{self._extension}",
+            )
+            if not os.path.exists(path):
+                return path
+            if not new_file and os.path.getsize(path) < self._max_bytes:
+                return path
+            index += 1
+
+    def _write(self, batch: list[tuple[datetime, dict]]) -> None:
+        """Format and append a batch. Runs in the executor."""
+        os.makedirs(self._directory, exist_ok=True)
+
+        by_day: dict[str, list[tuple[datetime, dict]]] = {}
+        for timestamp, data in batch:
+            by_day.setdefault(timestamp.strftime("%Y%m%d"), []).append(
+                (timestamp, _numeric_fields(data))
+            )
+
+        for day, rows in by_day.items():
+            if self._format == EXPORT_FORMAT_CSV:
+                self._write_csv(day, rows)
+                continue
+            with open(self._path(day), "a", encoding="utf-8", newline="") as file:
+                file.write(self._format_line_protocol(rows))
+
+    def _format_line_protocol(self, rows) -> str:
+        tag = _escape_tag(self._serial_number)
+        lines = []
+        for timestamp, fields in rows:
+            if not fields:
+                continue
+            values = ",".join(
+                f"{_escape_tag(key)}={value}" for key, value in fields.items()
+            )
+            lines.append(
+                f"atonstorage,serial={tag} {values} {int(timestamp.timestamp() * 1e9)}\n"
+            )
+        return "".join(lines)
+
+    def _read_header(self, path: str) -> list[str] | None:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8", newline="") as file:
+            return next(csv.reader(file), ["timestamp"])[1:]
+
+    def _write_csv(self, day: str, rows) -> None:
+        """Append rows, in a new file with a new header when columns change."""
+        path = self._csv_path if self._csv_day == day else None
+        if (
+            path is None
+            or not os.path.exists(path)
+            or os.path.getsize(path) >= self._max_bytes
+        ):
+            path = self._path(day)
+            header = self._read_header(path)
+            if self._columns is None:
+                self._columns = header
+            elif header is not None and header != self._columns:
+                path = self._path(day, new_file=True)
+
+        start = 0
+        while start < len(rows):
+            columns = set(self._columns or ())
+            end = start
+            while end < len(rows) and rows[end][1].keys() <= columns:
+                end += 1
+            if end == start:
+                # the next snapshot brings new columns
+                self._columns = sorted(columns.union(rows[start][1]))
+                if os.path.exists(path):
+                    path = self._path(day, new_file=True)
+                continue
+
+            new_file = not os.path.exists(path)
+            with open(path, "a", encoding="utf-8", newline="") as file:
+                file.write(self._format_csv(rows[start:end], new_file))
+            start = end
+        self._csv_day, self._csv_path = day, path
+
+    def _format_csv(self, rows, new_file: bool) -> str:
+        columns = self._columns or []
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if new_file:
+            writer.writerow(["timestamp", *columns])
+        for timestamp, fields in rows:
+            writer.writerow(
+                [timestamp.isoformat(), *(fields.get(key, "") for key in columns)]
+            )
+        return output.getvalue()
@@ -0,0 +1,211 @@
+"""Long-term statistics imported from the AtonTC history endpoints."""
+import logging
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.const import UnitOfElectricPotential
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN, HISTORY_BACKFILL_MONTHS
+from .controller import Controller as AtonStorage
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+_TIME_KEYS = ("data", "date", "timestamp", "x")
+_VALUE_KEYS = ("vb", "vbib", "value", "y")
+_TIME_FORMATS = ("%d/%m/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M")
+
+
+def _parse_time(value) -> datetime | None:
+    if isinstance(value, (int, float)):
+        # epoch, in milliseconds when coming from the portal charts
+        seconds = value / 1000 if value > 1e11 else value
+        return dt_util.utc_from_timestamp(seconds)
+    for time_format in _TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(str(value), time_format)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return None
+
+
+def parse_battery_voltage(data) -> list[tuple[datetime, float]]:
+    """Return the (time, voltage) points of a get_vbib.php response.
+
+    The response is a list of rows, optionally wrapped in an object, where
+    every row is either a `[time, value]` pair or an object with a time and
+    a voltage field. Rows that cannot be read are skipped.
+    """
+    if isinstance(data, dict):
+        data = next(
+            (data[key] for key in ("data", "vbib", "values") if key in data), []
+        )
+
+    points = []
+    for row in data or []:
+        if isinstance(row, dict):
+            time = next((row[key] for key in _TIME_KEYS if key in row), None)
+            value = next((row[key] for key in _VALUE_KEYS if key in row), None)
+        elif isinstance(row, (list, tuple)) and len(row) >= 2:
+            time, value = row[0], row[1]
+        else:
+            continue
+
+        timestamp = _parse_time(time)
+        try:
+            voltage = float(value)
+        except (TypeError, ValueError):
+            continue
+        if timestamp is not None:
+            points.append((timestamp, voltage))
+
+    return sorted(points)
+
+
+def _hourly_statistics(points: list[tuple[datetime, float]]) -> list["StatisticData"]:
+    # the recorder is only imported once it is known to be loaded
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder.models import StatisticData
+
+    hours: dict[datetime, list[float]] = {}
+    for timestamp, voltage in points:
+        start = dt_util.as_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+        hours.setdefault(start, []).append(voltage)
+
+    return [
+        StatisticData(
+            start=start,
+            mean=sum(values) / len(values),
+            min=min(values),
+            max=max(values),
+        )
+        for start, values in sorted(hours.items())
+    ]
+
+
+def _previous_month(year: int, month: int) -> tuple[int, int]:
+    return (year, month - 1) if month > 1 else (year - 1, 12)
+
+
+class BatteryVoltageHistory:
+    """Import the monthly battery voltage history as long-term statistics.
+
+    Every completed month is imported once it returned data, the current
+    month is fetched daily and only its new hours are imported. Needs the
+    recorder to be loaded.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, controller: AtonStorage, serial_number: str
+    ) -> None:
+        """Initialize."""
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import StatisticMetaData
+
+        self._hass = hass
+        self._controller = controller
+        self._serial_number = serial_number
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(serial_number)}_vbib"
+        )
+        self._imported_months: set[str] = set()
+        self._last_hour: datetime | None = None
+        self._unsubs = []
+        self._metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"{serial_number} battery voltage",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:battery_voltage_{slugify(serial_number)}",
+            unit_of_measurement=UnitOfElectricPotential.VOLT,
+        )
+
+    async def async_start(self) -> None:
+        """Load the import state and schedule the daily job."""
+        stored = await self._store.async_load() or {}
+        self._imported_months = set(stored.get("months", []))
+        if stored.get("last_hour"):
+            self._last_hour = dt_util.parse_datetime(stored["last_hour"])
+
+        self._unsubs.append(
+            async_track_time_change(
+                self._hass, self.async_update, hour=1, minute=30, second=0
+            )
+        )
+        self._unsubs.append(async_call_later(self._hass, 60, self.async_update))
+
+    @callback
+    def async_stop(self) -> None:
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    async def async_update(self, _now=None) -> None:
+        """Import the missing completed months and the current month."""
+        # the portal months follow the local calendar, not the host's
+        today = dt_util.now().date()
+        year, month = today.year, today.month
+        try:
+            for _ in range(HISTORY_BACKFILL_MONTHS):
+                year, month = _previous_month(year, month)
+                key = f"{year:04d}-{month:02d}"
+                if key in self._imported_months:
+                    continue
+                # an empty month is asked again, from the cache once closed
+                if self._import(await self._fetch(year, month, today)):
+                    self._imported_months.add(key)
+
+            points = await self._fetch(today.year, today.month, today)
+            if self._last_hour is not None:
+                # the last imported hour may have been partial, import it again
+                points = [point for point in points if point[0] >= self._last_hour]
+            self._import(points)
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                "Unable to import the battery voltage history of %s: %s",
+                self._serial_number,
+                exc,
+            )
+
+        await self._store.async_save(
+            {
+                "months": sorted(self._imported_months),
+                "last_hour": self._last_hour.isoformat() if self._last_hour else None,
+            }
+        )
+
+    async def _fetch(
+        self, year: int, month: int, today: date
+    ) -> list[tuple[datetime, float]]:
+        data = await self._controller.get_battery_voltage_history(year, month, today)
+        return parse_battery_voltage(data)
+
+    def _import(self, points: list[tuple[datetime, float]]) -> int:
+        """Import the points, return the number of hours imported."""
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        statistics = _hourly_statistics(points)
+        if not statistics:
+            return 0
+        async_add_external_statistics(self._hass, self._metadata, statistics)
+        last_hour = statistics[-1]["start"]
+        if self._last_hour is None or last_hour > self._last_hour:
+            self._last_hour = last_hour
+        _LOGGER.debug(
+            "Imported %s hours of battery voltage for %s",
+            len(statistics),
+            self._serial_number,
+        )
+        return len(statistics)
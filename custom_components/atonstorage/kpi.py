@@ -0,0 +1,158 @@
+"""Energy KPIs computed over the daily energy history of a plant."""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+PERIOD_YEAR = "year"
+PERIODS = [PERIOD_DAY, PERIOD_WEEK, PERIOD_MONTH, PERIOD_YEAR]
+
+# series name and the key of the daily energy sensor recording it, in kWh
+SERIES = (
+    ("bought", "eComprata"),
+    ("sold", "eVenduta"),
+    ("panel", "ePannelli"),
+    ("battery", "eBatteria"),
+)
+
+
+def self_sufficiency(bought: np.ndarray, battery: np.ndarray) -> np.ndarray:
+    """Vectorized DerivedMetrics.self_sufficiency."""
+    consumed = bought + battery
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(consumed == 0, 100, 100 - bought / consumed * 100)
+    return np.round(ratio, 2)
+
+
+def self_consumption(sold: np.ndarray, panel: np.ndarray) -> np.ndarray:
+    """Vectorized DerivedMetrics.self_consumption."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(panel == 0, 100, np.maximum(0, 100 - sold / panel * 100))
+    return np.round(ratio, 2)
+
+
+def _period_starts(days: np.ndarray, period: str) -> np.ndarray:
+    if period == PERIOD_DAY:
+        return days
+    if period == PERIOD_WEEK:
+        # 1970-01-01 was a Thursday, weeks start on Monday
+        return days - (days.astype(np.int64) + 3) % 7
+    unit = "M" if period == PERIOD_MONTH else "Y"
+    return days.astype(f"datetime64[{unit}]").astype("datetime64[D]")
+
+
+def _rows(starts: np.ndarray, columns: dict[str, np.ndarray], index) -> list[dict]:
+    return [
+        {
+            "start": str(starts[i]),
+            **{name: round(float(values[i]), 3) for name, values in columns.items()},
+        }
+        for i in index
+    ]
+
+
+def compute_kpis(
+    days: np.ndarray, series: dict[str, np.ndarray], period: str, rank: int
+) -> dict:
+    """Aggregate the daily series per period and rank the days.
+
+    `days` holds datetime64[D] values and `series` the bought, sold, panel
+    and battery energy of every day. The ratios of a period are computed
+    from its energy totals, the same way as for a single day.
+    """
+    starts, groups = np.unique(_period_starts(days, period), return_inverse=True)
+    totals = {
+        name: np.bincount(groups, weights=values, minlength=len(starts))
+        for name, values in series.items()
+    }
+    totals["self_sufficiency"] = self_sufficiency(totals["bought"], totals["battery"])
+    totals["self_consumption"] = self_consumption(totals["sold"], totals["panel"])
+
+    daily = dict(series)
+    daily["self_sufficiency"] = self_sufficiency(series["bought"], series["battery"])
+    daily["self_consumption"] = self_consumption(series["sold"], series["panel"])
+    productive = np.flatnonzero(series["panel"] > 0)
+
+    def _lowest(values: np.ndarray, among: np.ndarray) -> np.ndarray:
+        return among[np.argsort(values[among], kind="stable")[:rank]]
+
+    return {
+        "periods": _rows(starts, totals, range(len(starts))),
+        "lowest_self_sufficiency_days": _rows(
+            days, daily, _lowest(daily["self_sufficiency"], np.arange(len(days)))
+        ),
+        "lowest_export_days": _rows(days, daily, _lowest(series["sold"], productive)),
+        "highest_export_days": _rows(
+            days, daily, _lowest(-series["sold"], np.arange(len(days)))
+        ),
+    }
+
+
+async def async_load_daily_series(
+    hass: HomeAssistant, serial_number: str, start: date, end: date
+) -> tuple[np.ndarray, dict[str, np.ndarray], list[str]]:
+    """Load the daily energies between two dates from the long-term statistics.
+
+    Return the days, the series and the series without statistics.
+    """
+    # the recorder is only imported once it is known to be loaded
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder import get_instance
+
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder.statistics import (
+        statistics_during_period,
+    )
+
+    days = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end + timedelta(days=1), "D")
+    )
+    registry = er.async_get(hass)
+    statistic_ids = {
+        name: registry.async_get_entity_id("sensor", DOMAIN, f"{serial_number}_{key}")
+        for name, key in SERIES
+    }
+
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(dt_util.start_of_local_day(start)),
+        dt_util.as_utc(dt_util.start_of_local_day(end + timedelta(days=1))),
+        {statistic_id for statistic_id in statistic_ids.values() if statistic_id},
+        "day",
+        None,
+        {"change"},
+    )
+
+    series = {}
+    missing = []
+    for name, statistic_id in statistic_ids.items():
+        rows = stats.get(statistic_id) or []
+        if not rows:
+            missing.append(name)
+        values = np.zeros(len(days))
+        if rows:
+            index = (
+                np.array(
+                    [_local_day(row["start"]) for row in rows], dtype="datetime64[D]"
+                )
+                - days[0]
+            )
+            change = np.array([row.get("change") or 0 for row in rows], dtype=float)
+            inside = (index >= 0) & (index < len(days))
+            values[index[inside].astype(np.int64)] = change[inside]
+        series[name] = values
+    return days, series, missing
+
+
+def _local_day(start) -> date:
+    if not isinstance(start, datetime):
+        start = dt_util.utc_from_timestamp(start)
+    return dt_util.as_local(start).date()
@@ -0,0 +1,172 @@
+"""Time-shift (time of use) schedule of an AtonStorage plant."""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import slugify
+
+from .const import DOMAIN, TIME_SHIFT_CHECK_INTERVAL
+from .controller import Controller as AtonStorage
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+_START_KEYS = ("start", "inizio", "ora_inizio", "oraInizio", "from")
+_END_KEYS = ("end", "fine", "ora_fine", "oraFine", "to")
+_MODE_KEYS = ("mode", "modo", "tipo", "type")
+_DAYS_KEYS = ("days", "giorni")
+
+
+@dataclass(frozen=True)
+class TimeShiftSlot:
+    """A slot of the time-shift schedule."""
+
+    start: time
+    end: time
+    weekdays: frozenset[int] | None = None  # Monday is 0, None is every day
+    mode: str | None = None
+
+    def __str__(self) -> str:
+        slot = f"{self.start:%H:%M}-{self.end:%H:%M}"
+        return f"{slot} {self.mode}" if self.mode else slot
+
+    def _runs_on(self, day: datetime) -> bool:
+        return self.weekdays is None or day.weekday() in self.weekdays
+
+    def is_active(self, now: datetime) -> bool:
+        current = now.time()
+        if self.start < self.end:
+            return self._runs_on(now) and self.start <= current < self.end
+        # the slot runs over midnight
+        if current >= self.start:
+            return self._runs_on(now)
+        return current < self.end and self._runs_on(now - timedelta(days=1))
+
+    def next_start(self, now: datetime) -> datetime | None:
+        for days in range(8):
+            day = now + timedelta(days=days)
+            start = datetime.combine(day.date(), self.start, now.tzinfo)
+            if start > now and self._runs_on(start):
+                return start
+        return None
+
+
+def _parse_time(value) -> time | None:
+    for time_format in ("%H:%M", "%H:%M:%S", "%H.%M"):
+        try:
+            return datetime.strptime(str(value).strip(), time_format).time()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_weekdays(value) -> frozenset[int] | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        # bit mask, Monday is the lowest bit
+        return frozenset(day for day in range(7) if value & (1 << day))
+    if isinstance(value, str) and len(value) == 7 and set(value) <= {"0", "1"}:
+        return frozenset(day for day, flag in enumerate(value) if flag == "1")
+    if isinstance(value, (list, tuple)):
+        return frozenset(int(day) % 7 for day in value)
+    return None
+
+
+def decode_time_shift(data) -> list[TimeShiftSlot]:
+    """Decode a getTShift.php response.
+
+    The response is a list of slots, optionally wrapped in an object, each
+    with a start and an end time and optionally the week days and the mode.
+    Slots that cannot be read are skipped.
+    """
+    if isinstance(data, dict):
+        data = next(
+            (data[key] for key in ("data", "slots", "tshift") if key in data), []
+        )
+
+    slots = []
+    for row in data or []:
+        if not isinstance(row, dict):
+            continue
+        start = _parse_time(next((row[key] for key in _START_KEYS if key in row), ""))
+        end = _parse_time(next((row[key] for key in _END_KEYS if key in row), ""))
+        if start is None or end is None or start == end:
+            continue
+        mode = next((row[key] for key in _MODE_KEYS if key in row), None)
+        slots.append(
+            TimeShiftSlot(
+                start=start,
+                end=end,
+                weekdays=_parse_weekdays(
+                    next((row[key] for key in _DAYS_KEYS if key in row), None)
+                ),
+                mode=str(mode) if mode is not None else None,
+            )
+        )
+    return sorted(slots, key=lambda slot: slot.start)
+
+
+def active_slot(slots: list[TimeShiftSlot], now: datetime) -> TimeShiftSlot | None:
+    return next((slot for slot in slots if slot.is_active(now)), None)
+
+
+def next_slot(slots: list[TimeShiftSlot], now: datetime) -> TimeShiftSlot | None:
+    upcoming = [
+        (start, slot) for slot in slots if (start := slot.next_start(now)) is not None
+    ]
+    return min(upcoming, key=lambda item: item[0])[1] if upcoming else None
+
+
+class TimeShiftCoordinator(DataUpdateCoordinator):
+    """Keep the time-shift schedule up to date.
+
+    The cheap checkTShift.php endpoint is polled on a slow cadence and the
+    full schedule is downloaded only when its answer changes. The last
+    schedule is kept on disk so that a restart does not need to download it.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, controller: AtonStorage, serial_number: str
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{serial_number}_time_shift_coordinator",
+            update_interval=timedelta(seconds=TIME_SHIFT_CHECK_INTERVAL),
+        )
+        self.bridge = controller
+        self.serial_number = serial_number
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(serial_number)}_tshift"
+        )
+        self._token: str | None = None
+
+    async def async_load(self) -> None:
+        """Restore the schedule saved on disk."""
+        stored = await self._store.async_load()
+        if stored:
+            self._token = stored.get("token")
+            self.async_set_updated_data(decode_time_shift(stored.get("schedule")))
+
+    async def _async_update_data(self) -> list[TimeShiftSlot]:
+        try:
+            token = await self.bridge.check_time_shift()
+            if token == self._token and self.data is not None:
+                return self.data
+
+            _LOGGER.debug("Time-shift schedule of %s changed", self.serial_number)
+            raw = await self.bridge.get_time_shift()
+        except Exception as err:
+            raise UpdateFailed(
+                f"Could not update {self.serial_number} time-shift schedule: {err}"
+            ) from err
+
+        self._token = token
+        await self._store.async_save({"token": token, "schedule": raw})
+        return decode_time_shift(raw)
@@ -2,7 +2,7 @@
 import logging
 from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from homeassistant.components.integration.sensor import IntegrationSensor
@@ -21,16 +21,21 @@ from homeassistant.const import (
     UnitOfFrequency,
     UnitOfPower,
     UnitOfTemperature,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
-from homeassistant.util.dt import as_local
+from homeassistant.util.dt import as_local, now
 
 from .const import DOMAIN
 from .controller import Controller as AtonStorage
+from .schedule import TimeShiftSlot, active_slot, next_slot
+from .throttle import WritePolicy, WriteThrottle, write_policy_for
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,17 +44,45 @@ _LOGGER = logging.getLogger(__name__)
 class AtonStorageSensorEntityDescription(SensorEntityDescription):
     """Class to describe a AtonStorage sensor entity."""
 
-    value_conversion_function: Callable[[Any], Any] = lambda val: val
+    value_conversion_function: Callable[[Any], Any] = None
     value_calc_function: Callable[[AtonStorage], Any] = None
+    ev: bool = False
+    # (attribute name, raw data key) pairs exposed as state attributes
+    attributes: tuple[tuple[str, str], ...] = ()
+    # deadband overriding the device class default
+    write_policy: WritePolicy | None = None
+    # reads the coordinator instead of the controller
+    coordinator_function: Callable[[Any], Any] = None
+    # computed state attributes, from the coordinator
+    attributes_function: Callable[[Any], dict | None] = None
 
 
 @dataclass
 class AtonStorageIntegrationSensorEntityDescription(SensorEntityDescription):
     """Class to describe a AtonStorage Integration sensor entity."""
 
+    # key of the power sensor integrated into this energy
     source_sensor: str = None
 
 
+@dataclass
+class AtonStorageTimeShiftSensorEntityDescription(SensorEntityDescription):
+    """Class to describe a AtonStorage time-shift schedule sensor entity."""
+
+    slot_function: Callable[[list[TimeShiftSlot], datetime], TimeShiftSlot] = None
+
+
+# (flow, name, icon) of the energy flow matrix of DerivedMetrics
+ENERGY_FLOWS = (
+    ("solar_to_house", "Solar to house", "mdi:solar-power"),
+    ("solar_to_battery", "Solar to battery", "mdi:battery-charging"),
+    ("solar_to_grid", "Solar to grid", "mdi:transmission-tower-import"),
+    ("battery_to_house", "Battery to house", "mdi:home-battery"),
+    ("battery_to_grid", "Battery to grid", "mdi:transmission-tower-import"),
+    ("grid_to_house", "Grid to house", "mdi:transmission-tower-export"),
+    ("grid_to_battery", "Grid to battery", "mdi:battery-charging-outline"),
+)
+
 INVERTER_SENSOR_DESCRIPTIONS = (
     # LAST UPDATE
     AtonStorageSensorEntityDescription(
@@ -61,6 +94,47 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         value_conversion_function=lambda value: as_local(
             datetime.strptime(value, "%d/%m/%Y %H:%M:%S")
         ),
+        attributes=(
+            ("serial number", "serialNumber"),
+            ("firmware version", "fwScheda"),
+            ("bios version", "relBIOS"),
+        ),
+    ),
+    # DIAGNOSTICS
+    AtonStorageSensorEntityDescription(
+        key="DiffDate",
+        translation_key="DiffDate",
+        name="Update delay",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_conversion_function=lambda value: int(value),
+    ),
+    AtonStorageSensorEntityDescription(
+        key="status",
+        translation_key="status",
+        name="Status",
+        icon="mdi:list-status",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_conversion_function=lambda value: int(value),
+    ),
+    AtonStorageSensorEntityDescription(
+        key="statusMan",
+        translation_key="statusMan",
+        name="Status man",
+        icon="mdi:list-status",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    AtonStorageSensorEntityDescription(
+        key="runMode",
+        translation_key="runMode",
+        name="Run mode",
+        icon="mdi:cog-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_conversion_function=lambda value: int(value),
     ),
     # BATTERY
     AtonStorageSensorEntityDescription(
@@ -72,6 +146,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         state_class=SensorStateClass.MEASUREMENT,
         # Limit battery_level to a maximum of 100 and convert it to an integer
         value_conversion_function=lambda value: min(100, float(value) if value else 0),
+        attributes=(("raw data", "soc"), ("batteries number", "numBatterie")),
     ),
     AtonStorageSensorEntityDescription(
         key="vb",
@@ -107,6 +182,38 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement="AH",
         state_class=SensorStateClass.TOTAL_INCREASING,
     ),
+    # BATTERY ESTIMATES
+    AtonStorageSensorEntityDescription(
+        key="battery_time_to_full",
+        translation_key="battery_time_to_full",
+        name="Battery time to full",
+        icon="mdi:battery-clock",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_calc_function=lambda controller: controller.battery_time_to_full,
+    ),
+    AtonStorageSensorEntityDescription(
+        key="battery_time_to_empty",
+        translation_key="battery_time_to_empty",
+        name="Battery time to empty",
+        icon="mdi:battery-clock-outline",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_calc_function=lambda controller: controller.battery_time_to_empty,
+    ),
+    AtonStorageSensorEntityDescription(
+        key="battery_usable_capacity",
+        translation_key="battery_usable_capacity",
+        name="Battery usable capacity",
+        icon="mdi:battery-high",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY_STORAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_calc_function=lambda controller: controller.battery_usable_capacity,
+    ),
     # INSTANT POWER MEASUREMENTS
     AtonStorageSensorEntityDescription(
         key="pSolare",
@@ -292,9 +399,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        value_calc_function=lambda controller: abs(controller.instant_grid_power)
-        if controller.instant_grid_power < 0
-        else 0,
+        value_calc_function=lambda controller: controller.derived.grid_power_in,
     ),
     AtonStorageSensorEntityDescription(
         key="pRete_Out",
@@ -304,9 +409,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        value_calc_function=lambda controller: controller.instant_grid_power
-        if controller.instant_grid_power > 0
-        else 0,
+        value_calc_function=lambda controller: controller.derived.grid_power_out,
     ),
     # CONSUMED ENERGY
     AtonStorageSensorEntityDescription(
@@ -318,7 +421,8 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
-        value_calc_function=lambda controller: int(controller.consumed_energy) / 1000,
+        value_calc_function=lambda controller: controller.derived.consumed_energy
+        / 1000,
     ),
     # SELF SUFFICIENCY
     AtonStorageSensorEntityDescription(
@@ -330,18 +434,21 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         device_class=SensorDeviceClass.POWER_FACTOR,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_calc_function=lambda controller: (
-            100
-            if int(controller.consumed_energy) == 0
-            else round(
-                100
-                - (
-                    (int(controller.bought_energy) / int(controller.consumed_energy))
-                    * 100
-                ),
-                2,
-            )
-        ),
+        value_calc_function=lambda controller: controller.derived.self_sufficiency,
+        write_policy=WritePolicy(absolute=1),
+    ),
+    # SELF CONSUMPTION
+    AtonStorageSensorEntityDescription(
+        key="self_consumption",
+        translation_key="self_consumption",
+        name="Self consumption",
+        icon="mdi:solar-power-variant",
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_calc_function=lambda controller: controller.derived.self_consumption,
+        write_policy=WritePolicy(absolute=1),
     ),
     # BATTERY IN-OUT
     AtonStorageSensorEntityDescription(
@@ -352,9 +459,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        value_calc_function=lambda controller: controller.instant_battery_power
-        if controller.instant_battery_power > 0
-        else 0,
+        value_calc_function=lambda controller: controller.derived.battery_power_in,
     ),
     AtonStorageSensorEntityDescription(
         key="pBatteriaOut",
@@ -364,9 +469,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        value_calc_function=lambda controller: abs(controller.instant_battery_power)
-        if controller.instant_battery_power < 0
-        else 0,
+        value_calc_function=lambda controller: controller.derived.battery_power_out,
     ),
     # BATTERY CHARGED-DISCHARGED
     AtonStorageIntegrationSensorEntityDescription(
@@ -377,7 +480,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         # native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         # state_class=SensorStateClass.TOTAL,
-        source_sensor="instant_battery_power_input",
+        source_sensor="pBatteriaIn",
     ),
     AtonStorageIntegrationSensorEntityDescription(
         key="eDischarged",
@@ -387,19 +490,48 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         # native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         # state_class=SensorStateClass.TOTAL,
-        source_sensor="instant_battery_power_output",
+        source_sensor="pBatteriaOut",
+    ),
+    # ENERGY FLOWS
+    *(
+        AtonStorageSensorEntityDescription(
+            key=f"{flow}_power",
+            translation_key=f"{flow}_power",
+            name=f"{name} power",
+            icon=icon,
+            native_unit_of_measurement=UnitOfPower.WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_calc_function=lambda controller, flow=flow: getattr(
+                controller.derived, flow
+            ),
+        )
+        for flow, name, icon in ENERGY_FLOWS
+    ),
+    *(
+        AtonStorageIntegrationSensorEntityDescription(
+            key=f"{flow}_energy",
+            translation_key=f"{flow}_energy",
+            name=f"{name} energy",
+            icon=icon,
+            device_class=SensorDeviceClass.ENERGY,
+            source_sensor=f"{flow}_power",
+        )
+        for flow, name, icon in ENERGY_FLOWS
     ),
     # EV
     AtonStorageSensorEntityDescription(
         key="num_EV",
         translation_key="num_EV",
         name="EV num",
+        ev=True,
         # icon="mdi:solar-power-variant",
     ),
     AtonStorageSensorEntityDescription(
         key="SoC_EV",
         translation_key="SoC_EV",
         name="EV Battery level",
+        ev=True,
         native_unit_of_measurement=PERCENTAGE,
         device_class=SensorDeviceClass.BATTERY,
         state_class=SensorStateClass.MEASUREMENT,
@@ -411,6 +543,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="setp_EV",
         translation_key="setp_EV",
         name="EV setp",
+        ev=True,
         icon="mdi:car-electric",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
@@ -420,6 +553,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="potenza_EV",
         translation_key="potenza_EV",
         name="EV Charge",
+        ev=True,
         icon="mdi:car-electric",
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
@@ -429,6 +563,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="kmh",
         translation_key="kmh",
         name="EV kmh",
+        ev=True,
         icon="mdi:car-electric",
         state_class=SensorStateClass.MEASUREMENT,
     ),
@@ -437,6 +572,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="e_ciclo_EV",
         translation_key="e_ciclo_EV",
         name="EV Charged",
+        ev=True,
         icon="mdi:car-electric",
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
@@ -447,6 +583,7 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="km",
         translation_key="km",
         name="EV km",
+        ev=True,
         icon="mdi:car-electric",
         state_class=SensorStateClass.MEASUREMENT,
     ),
@@ -454,14 +591,103 @@ INVERTER_SENSOR_DESCRIPTIONS = (
         key="perc_carica",
         translation_key="perc_carica",
         name="EV charged percentage",
+        ev=True,
         icon="mdi:car-electric",
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         # Limit battery_level to a maximum of 100 and convert it to an integer
         value_conversion_function=lambda value: min(100, float(value) if value else 0),
     ),
+    # REQUESTS
+    AtonStorageSensorEntityDescription(
+        key="request_queue_wait",
+        translation_key="request_queue_wait",
+        name="Request queue wait",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        write_policy=WritePolicy(absolute=50, relative=0.2),
+        value_calc_function=lambda controller: controller.rate_limiter.stats[
+            "wait_last_ms"
+        ]
+        if controller.rate_limiter
+        else None,
+        attributes_function=lambda coordinator: coordinator.bridge.rate_limiter.stats
+        if coordinator.bridge.rate_limiter
+        else None,
+    ),
+    AtonStorageSensorEntityDescription(
+        key="poll_offset",
+        translation_key="poll_offset",
+        name="Poll offset",
+        icon="mdi:timer-cog-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        coordinator_function=lambda coordinator: round(coordinator.poll_offset, 1)
+        if coordinator.poll_offset is not None
+        else None,
+        attributes_function=lambda coordinator: {
+            "slot": coordinator.poll_slot[0] + 1,
+            "slots": coordinator.poll_slot[1],
+        }
+        if coordinator.poll_slot is not None
+        else None,
+    ),
+)
+
+# keys of the sensors integrated over time, every sample of them counts
+INTEGRATION_SOURCES = frozenset(
+    description.source_sensor
+    for description in INVERTER_SENSOR_DESCRIPTIONS
+    if isinstance(description, AtonStorageIntegrationSensorEntityDescription)
 )
 
+TIME_SHIFT_SENSOR_DESCRIPTIONS = (
+    AtonStorageTimeShiftSensorEntityDescription(
+        key="time_shift_active",
+        translation_key="time_shift_active",
+        name="Time shift active slot",
+        icon="mdi:calendar-clock",
+        slot_function=active_slot,
+    ),
+    AtonStorageTimeShiftSensorEntityDescription(
+        key="time_shift_next",
+        translation_key="time_shift_next",
+        name="Time shift next slot",
+        icon="mdi:calendar-arrow-right",
+        slot_function=next_slot,
+    ),
+)
+
+
+def _bind_value(
+    description: AtonStorageSensorEntityDescription,
+) -> Callable[[AtonStorage], Any]:
+    """Return the function reading the value of a description from a controller."""
+    calc = description.value_calc_function
+    if calc is None:
+        key = description.key
+
+        def calc(controller: AtonStorage):
+            return controller.data[key]
+
+    convert = description.value_conversion_function
+    if convert is None:
+        return calc
+    return lambda controller: convert(calc(controller))
+
+
+# bound once, shared by the entities of every entry
+_VALUE_FUNCTIONS = {
+    description.key: _bind_value(description)
+    for description in INVERTER_SENSOR_DESCRIPTIONS
+    if isinstance(description, AtonStorageSensorEntityDescription)
+    and description.coordinator_function is None
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -470,28 +696,71 @@ async def async_setup_entry(
 ) -> None:
     """Set up the AtonStorage sensors."""
     _LOGGER.debug("Set up the AtonStorage sensors")
-    entities = _create_entities(hass, entry)
-    async_add_entities(entities, True)
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+
+    @callback
+    def _async_add_selected(sensors_selected) -> None:
+        entities = _create_entities(hass, entry, sensors_selected)
+        entry_data["entities"].extend(entities)
+        async_add_entities(entities, True)
+
+    # called again by the options listener with the newly selected sensors
+    entry_data["entity_adders"].append(_async_add_selected)
+    _async_add_selected(entry_data["sensors_selected"])
+
+
+def _write_policy_for(description, options) -> WritePolicy | None:
+    """Never throttle the sources of the integration sensors."""
+    if description.key in INTEGRATION_SOURCES:
+        return None
+    return write_policy_for(description, options)
+
 
+def _source_entity_id(
+    hass: HomeAssistant,
+    serial_number: str,
+    description: AtonStorageIntegrationSensorEntityDescription,
+) -> str:
+    """Return the entity id of the power sensor an energy sensor integrates.
+
+    The entity id is looked up by unique id, it only has to be guessed for a
+    source sensor that was never added.
+    """
+    source = next(
+        source
+        for source in INVERTER_SENSOR_DESCRIPTIONS
+        if source.key == description.source_sensor
+    )
+    return (
+        er.async_get(hass).async_get_entity_id(
+            "sensor", DOMAIN, f"{serial_number}_{source.key}"
+        )
+        or f"sensor.{slugify(f'{serial_number} {source.name}')}"
+    )
 
-def _create_entities(hass: HomeAssistant, entry: dict):
+
+def _create_entities(hass: HomeAssistant, entry: ConfigEntry, sensors_selected):
     entities = []
 
     controller = hass.data[DOMAIN][entry.entry_id]["controller"]
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    username = hass.data[DOMAIN][entry.entry_id]["username"]
-    sensors_selected = hass.data[DOMAIN][entry.entry_id]["sensors_selected"]
+    device_info = hass.data[DOMAIN][entry.entry_id]["device_info"]
 
     for entity_description in INVERTER_SENSOR_DESCRIPTIONS:
         if entity_description.name in sensors_selected:
             if isinstance(entity_description, AtonStorageSensorEntityDescription):
+                if entity_description.ev and controller.has_external_ev is False:
+                    continue
                 entities.append(
                     AtonStorageSensorEntity(
                         entry=entry,
                         controller=controller,
                         coordinator=coordinator,
                         description=entity_description,
-                        username=username,
+                        device_info=device_info,
+                        write_policy=_write_policy_for(
+                            entity_description, entry.options
+                        ),
                     )
                 )
             elif isinstance(
@@ -500,19 +769,34 @@ def _create_entities(hass: HomeAssistant, entry: dict):
                 entities.append(
                     AtonStorageIntegrationSensor(
                         integration_method="left",
-                        name=f"{username} {entity_description.name}",
+                        name=f"{controller.serial_number} {entity_description.name}",
                         round_digits=2,
-                        source_entity=f"sensor.{slugify(username)}_{entity_description.source_sensor}",
+                        source_entity=_source_entity_id(
+                            hass, controller.serial_number, entity_description
+                        ),
                         unique_id=f"{controller.serial_number}_{entity_description.key}",
                         unit_prefix="k",
                         unit_time="h",
                         entry=entry,
                         controller=controller,
                         description=entity_description,
-                        username=username,
+                        device_info=device_info,
                     )
                 )
 
+    time_shift_coordinator = hass.data[DOMAIN][entry.entry_id]["time_shift_coordinator"]
+    for entity_description in TIME_SHIFT_SENSOR_DESCRIPTIONS:
+        if entity_description.name in sensors_selected:
+            entities.append(
+                AtonStorageTimeShiftSensorEntity(
+                    entry=entry,
+                    controller=controller,
+                    coordinator=time_shift_coordinator,
+                    description=entity_description,
+                    device_info=device_info,
+                )
+            )
+
     return entities
 
 
@@ -522,74 +806,101 @@ class AtonStorageSensorEntity(CoordinatorEntity, SensorEntity):
     entity_description: AtonStorageSensorEntityDescription
     # _attr_has_entity_name = True
 
+    # static or per cycle attributes, not worth a recorder row on every change
+    _unrecorded_attributes = frozenset(
+        {
+            "serial number",
+            "firmware version",
+            "bios version",
+            "requests",
+            "delayed",
+            "queued",
+            "active",
+            "wait_last_ms",
+            "wait_avg_ms",
+            "wait_max_ms",
+        }
+    )
+
     def __init__(
         self,
         entry: ConfigEntry,
         controller: AtonStorage,
         coordinator,
         description: AtonStorageSensorEntityDescription,
-        username,
-        # device_info,
+        device_info: DeviceInfo,
+        write_policy: WritePolicy | None = None,
     ):
         """Batched AtonStorage Sensor Entity constructor."""
         super().__init__(coordinator)
 
-        self.controller = controller
         self.entity_description = description
 
         # self._entry = entry
         # self._name = self.entity_description.name
         # self._attr_name = f"{controller.serial_number}_{self.entity_description.name}"
         # self._attr_translation_key = self.entity_description.key
-        self._attr_name = f"{username} {self.entity_description.name}"
+        self._attr_name = f"{controller.serial_number} {self.entity_description.name}"
         self._attr_unique_id = (
             f"{controller.serial_number}_{self.entity_description.key}"
         )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "AtonStorage " + username)},
-            name=username,
-            manufacturer="AtonStorage",
-            sw_version=controller.fw_Scheda,
-            serial_number=controller.serial_number,
-        )
-
-        self._register_key = self.entity_description.key
-        if "#" in self._register_key:
-            self._register_key = self._register_key[0 : self._register_key.find("#")]
-
-    @property
-    def native_value(self):
-        """Native sensor value."""
+        self._attr_device_info = device_info
 
-        if self.entity_description.value_calc_function:
-            value = self.entity_description.value_calc_function(self.controller)
+        if description.coordinator_function is not None:
+            self._value_function = lambda _controller: description.coordinator_function(
+                self.coordinator
+            )
         else:
-            value = self.controller.get_raw_data(self._register_key)
-
-        if self.entity_description.value_conversion_function:
-            value = self.entity_description.value_conversion_function(value)
+            self._value_function = _VALUE_FUNCTIONS.get(description.key) or _bind_value(
+                description
+            )
+        self._attributes_source = None
+        self._attributes = None
+        self._throttle = WriteThrottle(write_policy) if write_policy else None
+
+    @callback
+    def async_apply_options(self, options) -> None:
+        """Follow a change of the write throttling options."""
+        write_policy = _write_policy_for(self.entity_description, options)
+        self._throttle = WriteThrottle(write_policy) if write_policy else None
+
+    async def async_added_to_hass(self) -> None:
+        """Compute the first value."""
+        await super().async_added_to_hass()
+        self._attr_native_value = self._value_function(self.coordinator.bridge)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the write policy allows it."""
+        self._attr_native_value = self._value_function(self.coordinator.bridge)
+        if self._throttle is None or self._throttle.should_write(
+            self._attr_native_value, self.available
+        ):
+            self.async_write_ha_state()
 
-        return value
+    @property
+    def controller(self) -> AtonStorage:
+        return self.coordinator.bridge
 
     @property
     def extra_state_attributes(self):
-        if self.entity_description.key == "data":
-            attrSensor = {
-                "update delay (s)": self.controller.get_raw_data("DiffDate"),
-                "serial number": self.controller.get_raw_data("serialNumber"),
-                "firmware version": self.controller.get_raw_data("fwScheda"),
-                "bios version": self.controller.get_raw_data("relBIOS"),
-                "status": self.controller.get_raw_data("status"),
-                "status man": self.controller.get_raw_data("statusMan"),
-                "run mode": self.controller.get_raw_data("runMode"),
-            }
-            return attrSensor
-        if self.entity_description.key == "soc":
-            attrSensor = {
-                "raw data": self.controller.get_raw_data("soc"),
-                "batteries number": self.controller.get_raw_data("numBatterie"),
+        if self.entity_description.attributes_function is not None:
+            return self.entity_description.attributes_function(self.coordinator)
+        if not self.entity_description.attributes:
+            return None
+
+        # rebuild the dict only when one of its values changed
+        values = tuple(
+            self.controller.get_raw_data(raw_key)
+            for _, raw_key in self.entity_description.attributes
+        )
+        if values != self._attributes_source:
+            self._attributes_source = values
+            self._attributes = {
+                name: value
+                for (name, _), value in zip(self.entity_description.attributes, values)
             }
-            return attrSensor
+        return self._attributes
 
 
 class AtonStorageIntegrationSensor(IntegrationSensor):
@@ -610,7 +921,7 @@ class AtonStorageIntegrationSensor(IntegrationSensor):
         entry: ConfigEntry,
         controller: AtonStorage,
         description: AtonStorageIntegrationSensorEntityDescription,
-        username,
+        device_info: DeviceInfo,
     ) -> None:
         """Initialize the integration sensor."""
         super().__init__(
@@ -625,16 +936,8 @@ class AtonStorageIntegrationSensor(IntegrationSensor):
         )
 
         self.entity_description = description
-        self.controller = controller
-        self._entry = entry
         self._name = name
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "AtonStorage " + username)},
-            name=username,
-            manufacturer="AtonStorage",
-            sw_version=controller.fw_Scheda,
-            serial_number=controller.serial_number,
-        )
+        self._attr_device_info = device_info
 
     @property
     def icon(self):
@@ -643,3 +946,71 @@ class AtonStorageIntegrationSensor(IntegrationSensor):
     @property
     def device_class(self):
         return self.entity_description.device_class
+
+
+class AtonStorageTimeShiftSensorEntity(CoordinatorEntity, SensorEntity):
+    """AtonStorage time-shift slot, following the schedule and the clock."""
+
+    entity_description: AtonStorageTimeShiftSensorEntityDescription
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        controller: AtonStorage,
+        coordinator,
+        description: AtonStorageTimeShiftSensorEntityDescription,
+        device_info: DeviceInfo,
+    ):
+        """Initialize the time-shift sensor."""
+        super().__init__(coordinator)
+
+        self.entity_description = description
+        self._attr_name = f"{controller.serial_number} {self.entity_description.name}"
+        self._attr_unique_id = (
+            f"{controller.serial_number}_{self.entity_description.key}"
+        )
+        self._attr_device_info = device_info
+        self._slot = None
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the clock, slots change without a schedule update."""
+        await super().async_added_to_hass()
+        self._slot = self._current_slot()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_check_slot, timedelta(minutes=1)
+            )
+        )
+
+    def _current_slot(self) -> TimeShiftSlot | None:
+        return self.entity_description.slot_function(self.coordinator.data or [], now())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._slot = self._current_slot()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_check_slot(self, _now) -> None:
+        slot = self._current_slot()
+        if slot != self._slot:
+            self._slot = slot
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        """Native sensor value."""
+        return str(self._slot) if self._slot else None
+
+    @property
+    def extra_state_attributes(self):
+        if self._slot is None:
+            return None
+        return {
+            "start": self._slot.start.isoformat(),
+            "end": self._slot.end.isoformat(),
+            "mode": self._slot.mode,
+            "weekdays": sorted(self._slot.weekdays)
+            if self._slot.weekdays is not None
+            else None,
+        }
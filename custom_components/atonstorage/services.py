@@ -0,0 +1,181 @@
+"""Services for the AtonStorage integration."""
+import logging
+from datetime import timedelta
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CYCLES,
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_INTERVAL,
+    ATTR_PERIOD,
+    ATTR_RANK,
+    ATTR_START,
+    DEFAULT_CASSETTE_CYCLES,
+    DEFAULT_KPI_RANK,
+    DEFAULT_LIVE_DURATION,
+    DEFAULT_LIVE_INTERVAL,
+    DEFAULT_PROFILE_CYCLES,
+    DOMAIN,
+    MAX_LIVE_DURATION,
+    SERVICE_ENERGY_KPIS,
+    SERVICE_PROFILE,
+    SERVICE_RECORD_CASSETTE,
+    SERVICE_START_LIVE_MODE,
+    SERVICE_STOP_LIVE_MODE,
+)
+from .kpi import PERIOD_MONTH, PERIODS, async_load_daily_series, compute_kpis
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BASE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+SERVICE_START_LIVE_MODE_SCHEMA = SERVICE_BASE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_LIVE_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=60)
+        ),
+        vol.Optional(ATTR_DURATION, default=DEFAULT_LIVE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_LIVE_DURATION)
+        ),
+    }
+)
+
+SERVICE_RECORD_CASSETTE_SCHEMA = SERVICE_BASE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_CASSETTE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+
+SERVICE_PROFILE_SCHEMA = SERVICE_BASE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+SERVICE_ENERGY_KPIS_SCHEMA = SERVICE_BASE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_PERIOD, default=PERIOD_MONTH): vol.In(PERIODS),
+        vol.Optional(ATTR_RANK, default=DEFAULT_KPI_RANK): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=366)
+        ),
+    }
+)
+
+
+def _get_entries_data(hass: HomeAssistant, call: ServiceCall) -> list[dict]:
+    """Return the data of the entries targeted by a service call."""
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None:
+        return list(entries.values())
+    if entry_id not in entries:
+        raise HomeAssistantError(f"AtonStorage entry {entry_id} is not loaded")
+    return [entries[entry_id]]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the AtonStorage services."""
+
+    async def _async_start_live_mode(call: ServiceCall) -> None:
+        for entry_data in _get_entries_data(hass, call):
+            await entry_data["coordinator"].async_start_live_mode(
+                call.data[ATTR_INTERVAL], call.data[ATTR_DURATION]
+            )
+
+    async def _async_stop_live_mode(call: ServiceCall) -> None:
+        for entry_data in _get_entries_data(hass, call):
+            entry_data["coordinator"].async_stop_live_mode()
+
+    async def _async_record_cassette(call: ServiceCall) -> None:
+        for entry_data in _get_entries_data(hass, call):
+            entry_data["coordinator"].async_start_recording(call.data[ATTR_CYCLES])
+
+    async def _async_profile(call: ServiceCall) -> None:
+        entries_data = _get_entries_data(hass, call)
+        if len(entries_data) > 1:
+            raise HomeAssistantError(
+                f"Only one entry can be profiled at a time, set {ATTR_CONFIG_ENTRY_ID}"
+            )
+        for entry_data in entries_data:
+            entry_data["coordinator"].async_start_profiling(call.data[ATTR_CYCLES])
+
+    async def _async_energy_kpis(call: ServiceCall) -> ServiceResponse:
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("The energy KPIs need the recorder")
+        end = call.data.get(ATTR_END) or dt_util.now().date() - timedelta(days=1)
+        start = call.data.get(ATTR_START) or end.replace(day=1, month=1)
+        if start > end:
+            raise HomeAssistantError(f"The start {start} is after the end {end}")
+
+        response = {}
+        for entry_data in _get_entries_data(hass, call):
+            serial_number = entry_data["coordinator"].serial_number
+            days, series, missing = await async_load_daily_series(
+                hass, serial_number, start, end
+            )
+            response[serial_number] = {
+                ATTR_START: start.isoformat(),
+                ATTR_END: end.isoformat(),
+                ATTR_PERIOD: call.data[ATTR_PERIOD],
+                "missing": missing,
+                **compute_kpis(
+                    days, series, call.data[ATTR_PERIOD], call.data[ATTR_RANK]
+                ),
+            }
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_LIVE_MODE,
+        _async_start_live_mode,
+        schema=SERVICE_START_LIVE_MODE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_LIVE_MODE,
+        _async_stop_live_mode,
+        schema=SERVICE_BASE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_CASSETTE,
+        _async_record_cassette,
+        schema=SERVICE_RECORD_CASSETTE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=SERVICE_PROFILE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ENERGY_KPIS,
+        _async_energy_kpis,
+        schema=SERVICE_ENERGY_KPIS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
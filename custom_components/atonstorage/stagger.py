@@ -0,0 +1,54 @@
+"""Spread the polls of the AtonStorage entries over the scan interval."""
+import zlib
+from collections.abc import Callable
+
+MIN_POLL_DELAY = 1  # seconds
+
+
+def _order(serial_number: str) -> tuple[int, str]:
+    # crc32 rather than hash(), which changes on every start
+    return zlib.crc32(serial_number.encode("utf-8")), serial_number
+
+
+class PollScheduler:
+    """Give every polled plant its own phase of the scan interval.
+
+    The plants are ordered by a stable hash of their serial number and
+    spread evenly over the interval, and the phases are aligned to the wall
+    clock. The schedule only depends on the set of plants, so it is the
+    same after a restart.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._serial_numbers: list[str] = []
+
+    def register(self, serial_number: str) -> Callable[[], None]:
+        """Add a plant, return the callback removing it."""
+        self._serial_numbers.append(serial_number)
+        self._serial_numbers.sort(key=_order)
+
+        def _unregister() -> None:
+            self._serial_numbers.remove(serial_number)
+
+        return _unregister
+
+    def slot(self, serial_number: str) -> tuple[int, int] | None:
+        """Return the slot of a plant and the number of slots."""
+        if serial_number not in self._serial_numbers:
+            return None
+        return self._serial_numbers.index(serial_number), len(self._serial_numbers)
+
+    def offset(self, serial_number: str, interval: float) -> float | None:
+        """Return the seconds into every interval at which the plant polls."""
+        slot = self.slot(serial_number)
+        if slot is None:
+            return None
+        index, count = slot
+        return interval * index / count
+
+    def next_poll(self, serial_number: str, interval: float, now: float) -> float:
+        """Return the delay until the next poll of the plant, in seconds."""
+        offset = self.offset(serial_number, interval) or 0
+        delay = (offset - now) % interval
+        return delay if delay >= MIN_POLL_DELAY else delay + interval
@@ -0,0 +1,111 @@
+"""Write policies limiting the state writes of jittery sensors."""
+from dataclasses import dataclass, replace
+from time import monotonic
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+
+from .const import (
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_RELATIVE_DEADBAND,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_RELATIVE_DEADBAND,
+)
+
+
+@dataclass(frozen=True)
+class WritePolicy:
+    """When a new value is worth a state write.
+
+    A value is written when it moves out of the band around the last
+    written value, the band being the largest of `absolute` and `relative`
+    times the last value, but never sooner than `min_interval` seconds after
+    the previous write. A value is always written once `heartbeat` seconds
+    have passed.
+    """
+
+    absolute: float = 0
+    relative: float = 0
+    min_interval: float = 0
+    heartbeat: float = DEFAULT_HEARTBEAT_INTERVAL
+
+    def band(self, value: float) -> float:
+        return max(self.absolute, abs(value) * self.relative)
+
+
+# absolute deadbands, in the native unit of the description
+DEVICE_CLASS_DEADBANDS = {
+    SensorDeviceClass.POWER: DEFAULT_POWER_DEADBAND,
+    SensorDeviceClass.VOLTAGE: 1,
+    SensorDeviceClass.CURRENT: 0.1,
+    SensorDeviceClass.FREQUENCY: 0.02,
+    SensorDeviceClass.TEMPERATURE: 0.5,
+    SensorDeviceClass.POWER_FACTOR: 0.5,
+}
+
+
+def write_policy_for(description, options) -> WritePolicy | None:
+    """Return the write policy of a sensor description, None to write always.
+
+    The deadband comes from the description, or else from the device class
+    and the options, the intervals always come from the options. Only
+    measurements are throttled, totals are always written.
+    """
+    if description.state_class != SensorStateClass.MEASUREMENT:
+        return None
+
+    policy = getattr(description, "write_policy", None)
+    if policy is None:
+        absolute = DEVICE_CLASS_DEADBANDS.get(description.device_class, 0)
+        if description.device_class == SensorDeviceClass.POWER:
+            absolute = options.get(CONF_POWER_DEADBAND, absolute)
+        policy = WritePolicy(
+            absolute=absolute,
+            relative=options.get(CONF_RELATIVE_DEADBAND, DEFAULT_RELATIVE_DEADBAND)
+            / 100,
+        )
+
+    return replace(
+        policy,
+        min_interval=options.get(CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL),
+        heartbeat=options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL),
+    )
+
+
+class WriteThrottle:
+    """Track the last written value of an entity against its policy."""
+
+    __slots__ = ("policy", "_value", "_available", "_written_at")
+
+    def __init__(self, policy: WritePolicy) -> None:
+        """Initialize."""
+        self.policy = policy
+        self._value = None
+        self._available = None
+        self._written_at = 0.0
+
+    def should_write(self, value, available: bool) -> bool:
+        """Return whether the value must be written, and remember it if so."""
+        now = monotonic()
+        elapsed = now - self._written_at
+        if (
+            available == self._available
+            and elapsed < self.policy.heartbeat
+            and (elapsed < self.policy.min_interval or self._within_band(value))
+        ):
+            return False
+
+        self._value = value
+        self._available = available
+        self._written_at = now
+        return True
+
+    def _within_band(self, value) -> bool:
+        if not isinstance(value, (int, float)) or not isinstance(
+            self._value, (int, float)
+        ):
+            return value == self._value
+        return abs(value - self._value) <= self.policy.band(self._value)
@@ -0,0 +1,101 @@
+"""Websocket API streaming the decoded snapshots of the AtonStorage plants."""
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import ATTR_CONFIG_ENTRY_ID, DOMAIN, SIGNAL_SNAPSHOT, SNAPSHOT_RING_SIZE
+
+ATTR_FIELDS = "fields"
+ATTR_REPLAY = "replay"
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the AtonStorage websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_snapshots)
+
+
+def _changes(previous: dict | None, data: dict, fields) -> dict:
+    keys = fields if fields is not None else data.keys()
+    if previous is None:
+        return {key: data.get(key) for key in keys}
+    return {key: data.get(key) for key in keys if data.get(key) != previous.get(key)}
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_snapshots",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_FIELDS): [str],
+        vol.Optional(ATTR_REPLAY, default=0): vol.All(
+            int, vol.Range(min=0, max=SNAPSHOT_RING_SIZE)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_snapshots(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream the changed fields of every new snapshot.
+
+    The first event of a plant carries every field, the next ones only the
+    fields that changed. With `replay` the last snapshots kept in memory
+    are sent first.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = msg.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is not None:
+        if entry_id not in entries:
+            connection.send_error(
+                msg["id"], "not_found", f"AtonStorage entry {entry_id} is not loaded"
+            )
+            return
+        entries = {entry_id: entries[entry_id]}
+
+    fields = msg.get(ATTR_FIELDS)
+    previous: dict[str, dict] = {}
+
+    @callback
+    def _async_send(serial_number: str, time: str, data: dict) -> None:
+        changes = _changes(previous.get(serial_number), data, fields)
+        previous[serial_number] = data
+        if changes:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {"serial_number": serial_number, "time": time, "changes": changes},
+                )
+            )
+
+    unsubs = []
+    for entry_data in entries.values():
+        coordinator = entry_data["coordinator"]
+
+        @callback
+        def _async_snapshot(data: dict, serial_number=coordinator.serial_number):
+            _async_send(serial_number, data.get("data"), data)
+
+        unsubs.append(
+            async_dispatcher_connect(
+                hass, SIGNAL_SNAPSHOT.format(coordinator.serial_number), _async_snapshot
+            )
+        )
+
+    @callback
+    def _async_unsubscribe() -> None:
+        while unsubs:
+            unsubs.pop()()
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+
+    if msg[ATTR_REPLAY]:
+        for entry_data in entries.values():
+            coordinator = entry_data["coordinator"]
+            for data in list(coordinator.snapshots)[-msg[ATTR_REPLAY] :]:
+                _async_send(coordinator.serial_number, data.get("data"), data)
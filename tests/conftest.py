@@ -0,0 +1,12 @@
+"""Make the Home Assistant free atontc package importable on its own."""
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "custom_components",
+        "atonstorage",
+    ),
+)
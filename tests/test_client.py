@@ -0,0 +1,27 @@
+"""Tests of the AtonTC client answers parsing."""
+import pytest
+
+from atontc.client import _ev_answer
+
+
+@pytest.mark.parametrize(
+    ("answer", "expected"),
+    [
+        (True, True),
+        (1, True),
+        ("1", True),
+        ([1], True),
+        ({"hasExternalEV": "1"}, True),
+        (False, False),
+        (0, False),
+        ("0", False),
+        ({"id_impianto": 151762966, "ev": 0}, False),
+        # nothing says whether there is a charger
+        ({"id_impianto": 151762966}, None),
+        ([1, 0], None),
+        (None, None),
+        ("Unknown", None),
+    ],
+)
+def test_ev_answer(answer, expected):
+    assert _ev_answer(answer) is expected
@@ -0,0 +1,104 @@
+"""Tests of the metrics derived from a monitor snapshot."""
+import json
+import os
+
+import pytest
+
+from atontc.derived import allocate_flows, compute_derived
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "monitor.json")
+
+
+@pytest.fixture(name="data")
+def data_fixture() -> dict:
+    with open(FIXTURE, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _assert_balanced(flows: dict, solar: int, house: int, battery: int, grid: int):
+    assert all(power >= 0 for power in flows.values())
+    assert (
+        flows["solar_to_house"] + flows["solar_to_battery"] + flows["solar_to_grid"]
+        == solar
+    )
+    assert (
+        flows["solar_to_house"] + flows["battery_to_house"] + flows["grid_to_house"]
+        == house
+    )
+    assert (
+        flows["solar_to_battery"]
+        + flows["grid_to_battery"]
+        - flows["battery_to_house"]
+        - flows["battery_to_grid"]
+        == battery
+    )
+    assert (
+        flows["solar_to_grid"]
+        + flows["battery_to_grid"]
+        - flows["grid_to_house"]
+        - flows["grid_to_battery"]
+        == grid
+    )
+
+
+def test_ratios(data):
+    metrics = compute_derived(data)
+    assert metrics.consumed_energy == 7690
+    assert metrics.self_sufficiency == 80.75
+    assert metrics.self_consumption == 73.36
+
+
+def test_powers(data):
+    metrics = compute_derived(data)
+    assert metrics.grid_power_in == 0
+    assert metrics.grid_power_out == 130
+    assert metrics.battery_power_in == 1540
+    assert metrics.battery_power_out == 0
+
+
+def test_flows_balance(data):
+    metrics = compute_derived(data)
+    flows = {
+        flow: getattr(metrics, flow)
+        for flow in (
+            "solar_to_house",
+            "solar_to_battery",
+            "solar_to_grid",
+            "battery_to_house",
+            "battery_to_grid",
+            "grid_to_house",
+            "grid_to_battery",
+        )
+    }
+    _assert_balanced(flows, 2310, 640, 1540, 130)
+
+
+@pytest.mark.parametrize(
+    ("solar", "house", "battery", "grid", "status"),
+    [
+        (0, 900, -600, -300, 0),
+        (400, 900, -500, 0, 0),
+        (3000, 500, 1000, 1500, 0),
+        (0, 0, 800, -800, 32),
+        (1000, 200, -700, 1500, 64 | 16 | 4),
+    ],
+)
+def test_allocated_flows_balance(solar, house, battery, grid, status):
+    _assert_balanced(
+        allocate_flows(solar, house, battery, grid, status), solar, house, battery, grid
+    )
+
+
+def test_no_energy_is_self_sufficient():
+    metrics = compute_derived({})
+    assert metrics.self_sufficiency == 100
+    assert metrics.self_consumption == 100
+
+
+def test_malformed_values(data):
+    data = {**data, "pRete": "130.0", "pBatteria": "1540.7", "pSolare": "n/a"}
+    metrics = compute_derived(data)
+    assert metrics.grid_power_out == 130
+    assert metrics.battery_power_in == 1540
+    assert metrics.solar_to_house == 0
+    assert metrics.self_sufficiency == 80.75
@@ -0,0 +1,32 @@
+"""Tests of the plants parsed from the portal login page."""
+import os
+
+from atontc.plants import Plant, parse_plants
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+def test_plant_id_alone_is_not_a_plant():
+    # without a serial number the entry cannot be created from the page
+    assert parse_plants(_page("login_single_plant.html")) == []
+
+
+def test_several_plants():
+    assert parse_plants(_page("login_several_plants.html")) == [
+        Plant("151762966", "T00000000001", "Casa"),
+        Plant("151762967", "T00000000002", "Garage & officina"),
+    ]
+
+
+def test_script_variables():
+    page = 'var idImpianto = 42;\nvar sn = "T00000000003";\n'
+    assert parse_plants(page) == [Plant("42", "T00000000003")]
+
+
+def test_no_plants():
+    assert parse_plants("<html><body>Unauthorized</body></html>") == []